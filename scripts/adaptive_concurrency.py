@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import httpx
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """
+    Whether an error means upstream is overloaded: HTTP 429 or 5xx, a timeout
+    or a dropped connection
+    """
+    if isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    if status_code is None:
+        return False
+    return status_code == 429 or status_code >= 500
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on in-flight
+    requests.
+
+    The limit grows by one after each window of `limit` healthy completions and
+    is multiplied by `backoff_factor` on a 429/5xx, a timeout or a dropped
+    connection, or when the latency EWMA rises above `latency_tolerance` times
+    the best EWMA seen so far. At most one decrease happens per window so a
+    burst of failures from the same window only backs off once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        ewma_alpha: float = 0.2,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.ewma_alpha = ewma_alpha
+
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.peak_limit = self.limit
+        self.increases = 0
+        self.decreases = 0
+
+        self._healthy_completions = 0
+        self._completions_since_decrease = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "peak_limit": self.peak_limit,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "latency_ewma": self.latency_ewma,
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Wait until fewer than `limit` requests are in flight"""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float], congested: bool = False):
+        """
+        Record the outcome of a request and adjust the limit. A failed request
+        passes `latency=None`, it never counts as a healthy completion.
+        """
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            self._record(latency, congested)
+            condition.notify_all()
+
+    def _record(self, latency: Optional[float], congested: bool):
+        self._completions_since_decrease += 1
+
+        latency_spike = False
+        if latency is not None:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+            if (
+                self.baseline_latency is None
+                or self.latency_ewma < self.baseline_latency
+            ):
+                self.baseline_latency = self.latency_ewma
+            latency_spike = (
+                self.latency_ewma > self.baseline_latency * self.latency_tolerance
+            )
+
+        if congested or latency_spike:
+            self._healthy_completions = 0
+            if self._completions_since_decrease >= self.limit:
+                self._decrease(latency_spike)
+            return
+
+        if latency is None:
+            # Failed without congestion (e.g. a 404), neither grow nor shrink
+            return
+
+        self._healthy_completions += 1
+        if self._healthy_completions >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self.increases += 1
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self._healthy_completions = 0
+
+    def _decrease(self, latency_spike: bool):
+        self.limit = max(self.min_limit, int(self.limit * self.backoff_factor))
+        self.decreases += 1
+        self._completions_since_decrease = 0
+        if latency_spike:
+            # Let the baseline drift up so a permanently slower upstream
+            # (e.g. during registration) does not pin the limit at min_limit
+            self.baseline_latency *= 1.1
+
+
+async def benchmark(
+    items: int = 300,
+    capacity: int = 12,
+    base_latency: float = 0.05,
+    overload_latency: float = 0.5,
+    error_rate: float = 0.3,
+):
+    """
+    Run the controller against an in-process stand-in server that slows down
+    and starts returning 503s once more than `capacity` requests are in flight
+    """
+
+    class StandInServerError(Exception):
+        def __init__(self, status_code: int):
+            super().__init__(f"HTTP {status_code}")
+            self.response = type("Response", (), {"status_code": status_code})()
+
+    controller = AdaptiveConcurrencyController(initial_limit=2, max_limit=64)
+    server_in_flight = 0
+    errors = 0
+
+    async def request():
+        nonlocal server_in_flight
+        server_in_flight += 1
+        try:
+            overloaded = server_in_flight > capacity
+            await asyncio.sleep(overload_latency if overloaded else base_latency)
+            if overloaded and random.random() < error_rate:
+                raise StandInServerError(503)
+        finally:
+            server_in_flight -= 1
+
+    async def worker(queue: asyncio.Queue):
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            await controller.acquire()
+            start = time.perf_counter()
+            try:
+                await request()
+                await controller.release(time.perf_counter() - start)
+            except StandInServerError as e:
+                errors += 1
+                await controller.release(None, is_congestion_error(e))
+
+    queue = asyncio.Queue()
+    for i in range(items):
+        queue.put_nowait(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(queue) for _ in range(controller.max_limit)])
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{items} requests in {elapsed:.2f}s ({items / elapsed:.1f} req/s), "
+        f"{errors} errors, final limit {controller.limit}, "
+        f"peak limit {controller.peak_limit}, "
+        f"latency EWMA {controller.latency_ewma * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -1,7 +1,270 @@
+import asyncio
+import atexit
+import contextlib
+import gzip
+import hashlib
 import json
+import math
+import mmap
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.parse import quote, unquote
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locking on Windows
+    fcntl = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class CacheCodec:
+    """
+    Serializes cache values to JSON bytes, optionally compressed.
+
+    `compression` is None, "gzip" or "zstd" (requires the `zstandard`
+    package). A trained zstd dictionary (see `train_zstd_dictionary`) makes
+    small, repetitive records like MyPlan course details compress far better.
+    Decoding detects the format from the magic bytes, so entries written with
+    a different setting, including old uncompressed JSON, still load.
+    """
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        level: int | None = None,
+        zstd_dict_file: str | Path | None = None,
+    ):
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.level = level
+        self.zstd_dict = None
+        if (compression == "zstd" or zstd_dict_file is not None) and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        if zstd_dict_file is not None:
+            with open(zstd_dict_file, "rb") as f:
+                self.zstd_dict = zstandard.ZstdCompressionDict(f.read())
+        # zstandard (de)compressors must not be shared between threads
+        self._local = threading.local()
+
+    def _zstd_compressor(self):
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(
+                level=self.level or 3, dict_data=self.zstd_dict
+            )
+        return self._local.compressor
+
+    def _zstd_decompressor(self):
+        if not hasattr(self._local, "decompressor"):
+            self._local.decompressor = zstandard.ZstdDecompressor(
+                dict_data=self.zstd_dict
+            )
+        return self._local.decompressor
+
+    def encode(self, value) -> bytes:
+        data = json.dumps(value).encode()
+        if self.compression == "zstd":
+            return self._zstd_compressor().compress(data)
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level or 6)
+        return data
+
+    def decode(self, data: bytes | str):
+        if isinstance(data, bytes):
+            if data.startswith(ZSTD_MAGIC):
+                if zstandard is None:
+                    raise ImportError(
+                        "Reading zstd cache entries requires the zstandard package"
+                    )
+                data = self._zstd_decompressor().decompress(data)
+            elif data.startswith(GZIP_MAGIC):
+                data = gzip.decompress(data)
+        return json.loads(data)
+
+
+def train_zstd_dictionary(
+    cache_controller,
+    dict_file: str | Path,
+    samples: int = 2000,
+    dict_size: int = 112640,
+):
+    """Train a zstd dictionary from up to `samples` entries of a cache"""
+    if zstandard is None:
+        raise ImportError("Training a zstd dictionary requires the zstandard package")
+    data = []
+    for key in cache_controller.keys()[:samples]:
+        value = cache_controller.get(key)
+        if value is not None:
+            data.append(json.dumps(value).encode())
+    zstd_dict = zstandard.train_dictionary(dict_size, data)
+    with open(dict_file, "wb") as f:
+        f.write(zstd_dict.as_bytes())
+    return zstd_dict
+
+
+def _atomic_write(path: Path, data: bytes):
+    """
+    Write `data` to `path` via a temp file and rename, so readers never see a
+    partial file. The temp name is unique per thread and has no .json suffix,
+    so cache scans skip it.
+    """
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    with open(tmp_file, "wb") as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
+def _file_stat(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _stale_cutoff(ttl: float) -> str:
+    # last_synced is stored as an ISO string, which sorts chronologically
+    return (datetime.now() - timedelta(seconds=ttl)).isoformat()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` keys at `error_rate` false
+    positives. Membership tests never give false negatives, so a miss proves
+    the key was never added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class LruCache:
+    """
+    Thread-safe in-memory LRU map bounded by entry count and/or approximate
+    bytes (as reported by the caller on `put`), with hit/miss/eviction
+    counters. A bound of None means unlimited.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns `(True, value)` on a hit and `(False, None)` on a miss"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: str, value, size: int = 0):
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.size += size
+            while (
+                self.max_entries is not None and len(self.entries) > self.max_entries
+            ) or (self.max_bytes is not None and self.size > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key: str):
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class AsyncCacheMixin:
+    """
+    Async variants of the cache methods for use inside the event loop. Calls
+    run on a thread pool of `io_workers` threads owned by the controller, which
+    also bounds how many file or database operations run at once.
+    """
+
+    io_workers: int = 8
+    _io_executor: ThreadPoolExecutor | None = None
+
+    def _run_io(self, func, *args):
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="cache-io"
+            )
+        return asyncio.get_running_loop().run_in_executor(
+            self._io_executor, func, *args
+        )
+
+    async def aget(self, key):
+        return await self._run_io(self.get, key)
+
+    async def aset(self, key: str, value):
+        await self._run_io(self.set, key, value)
+
+    async def aset_many(self, items: dict):
+        await self._run_io(self.set_many, items)
+
+    async def acontains(self, key: str) -> bool:
+        return await self._run_io(self.contains, key)
+
+    async def atouch(self, key: str, **fields):
+        await self._run_io(lambda: self.touch(key, **fields))
 
 
 class LocalCacheController:
@@ -11,10 +274,11 @@ class LocalCacheController:
 
     cache_file: Path
 
-    def __init__(self, cache_file: str | Path):
+    def __init__(self, cache_file: str | Path, codec: CacheCodec | None = None):
         if isinstance(cache_file, str):
             cache_file = Path(cache_file)
         self.cache_file = cache_file
+        self.codec = codec or CacheCodec()
 
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
 
@@ -23,110 +287,807 @@ class LocalCacheController:
     def load(self):
         if not self.cache_file.exists():
             return {}
-        with open(self.cache_file, "r") as f:
-            self.cache_data = json.load(f)
+        with open(self.cache_file, "rb") as f:
+            self.cache_data = self.codec.decode(f.read())
 
     def save(self):
-        with open(self.cache_file, "w") as f:
-            json.dump(self.cache_data, f)
+        _atomic_write(self.cache_file, self.codec.encode(self.cache_data))
 
     def get(self, key):
         return self.cache_data.get(key)
 
+    def contains(self, key) -> bool:
+        return key in self.cache_data
+
     def set(self, key, value):
         self.cache_data[key] = value
 
+    def set_many(self, items: dict):
+        self.cache_data.update(items)
+
 
-class DistributedCacheController:
+class DistributedCacheController(AsyncCacheMixin):
     """
     Local cache controller for storing data in a local file.
+
+    Each value lives in its own file under `data/`, while `overview.json` maps
+    keys to their `last_synced` time. Overview updates are buffered and written
+    (via an atomic rename) every `overview_flush_every` changes, after
+    `overview_flush_interval` seconds, on `flush()` and at interpreter exit.
+    Data files are written first and `get()` reads them directly, so losing
+    unflushed overview entries in a crash never loses cached values.
+
+    All files are replaced atomically (temp file + rename). Overview saves hold
+    an advisory lock on `overview.lock` and merge this process's changes into
+    the file on disk, so several processes can share one cache directory.
+
+    Setting `lru_max_entries` and/or `lru_max_bytes` (measured as stored file
+    size) keeps recently used values decoded in memory, see `lru.stats()`.
+    Values returned from the LRU are shared, so callers must not mutate them.
+
+    `ttl` (seconds) is the freshness window for this cache's namespace: entries
+    synced longer ago are reported by `is_stale()` and `stale_keys()`, but are
+    still returned by `get()`. Besides `last_synced`, overview entries record
+    `last_changed` (when the value was last written) and any metadata stored
+    with `touch()`, such as HTTP validators. `touch()` marks an entry as
+    synced without rewriting an unchanged value.
+
+    The "flat" layout stores `data/<key>.json`. The "hashed" layout fans files
+    out as `data/ab/cd/<encoded key>.json`, using the key's MD5 and
+    percent-encoding anything unsafe in a file name, which keeps directories
+    small for large caches. Hashed caches record their layout in `layout.txt`
+    and are detected automatically; convert with `migrate_layout()` or
+    `scripts/migrate_cache_layout.py`.
+
+    `compact()` packs all entries into one `pack-*.bin` file with an offset
+    index in `pack.json`. Packed values are read as slices of a memory map
+    and `items()` iterates them with one sequential read. Later writes go to
+    regular data files, which take precedence over the pack until the next
+    compaction.
     """
 
     cache_dir: Path
     cache_overview_file: Path
     cache_data_dir: Path
 
-    def __init__(self, cache_dir: str | Path):
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        overview_flush_every: int = 100,
+        overview_flush_interval: float = 5.0,
+        codec: CacheCodec | None = None,
+        lru_max_entries: int | None = None,
+        lru_max_bytes: int | None = None,
+        ttl: float | None = None,
+        layout: str | None = None,
+    ):
         if isinstance(cache_dir, str):
             cache_dir = Path(cache_dir)
         self.cache_dir = cache_dir
+        self.codec = codec or CacheCodec()
+        self.ttl = ttl
+        self.cache_layout_file = self.cache_dir / "layout.txt"
+        self.layout = self._resolve_layout(layout)
+        self.lru = None
+        if lru_max_entries is not None or lru_max_bytes is not None:
+            self.lru = LruCache(lru_max_entries, lru_max_bytes)
         self.cache_overview_file = self.cache_dir / "overview.json"
         self.cache_data_dir = self.cache_dir / "data"
 
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_data_dir.mkdir(parents=True, exist_ok=True)
+        if self.layout != "flat" and not self.cache_layout_file.exists():
+            self.cache_layout_file.write_text(self.layout)
 
         self.cache_overview_data = {}
 
-    def _get_data_file_path(self, key):
-        return self.cache_data_dir / f"{key}.json"
+        self.overview_flush_every = overview_flush_every
+        self.overview_flush_interval = overview_flush_interval
+        self._overview_changes = 0
+        self._overview_dirty_keys: set[str] = set()
+        self._overview_deleted_keys: set[str] = set()
+        self._overview_file_stat: tuple[int, int] | None = None
+        self.cache_overview_lock_file = self.cache_dir / "overview.lock"
+        self._overview_last_flush = time.monotonic()
+        self._overview_lock = threading.RLock()
+        self._loaded = False
+        self._loose_keys: set[str] = set()
+
+        self.cache_pack_index_file = self.cache_dir / "pack.json"
+        self.pack_index: dict[str, list[int]] = {}
+        self._pack: mmap.mmap | None = None
+        self._pack_file: str | None = None
+        self._pack_index_stat: tuple[int, int] | None = None
+        self._open_pack()
+        atexit.register(self.flush)
+
+    def _resolve_layout(self, layout: str | None) -> str:
+        existing = (
+            self.cache_layout_file.read_text().strip()
+            if self.cache_layout_file.exists()
+            else None
+        )
+        if layout is None:
+            return existing or "flat"
+        if layout not in ("flat", "hashed"):
+            raise ValueError(f"Unknown cache layout: {layout}")
+        if existing is not None and existing != layout:
+            raise ValueError(
+                f"{self.cache_dir} uses the {existing} layout, "
+                f"migrate it with migrate_layout({layout!r}) first"
+            )
+        return layout
+
+    def _get_data_file_path(self, key, layout: str | None = None):
+        if (layout or self.layout) == "flat":
+            return self.cache_data_dir / f"{key}.json"
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return (
+            self.cache_data_dir
+            / digest[:2]
+            / digest[2:4]
+            / f"{quote(key, safe=' ')}.json"
+        )
+
+    def _decode_key(self, file_name: str) -> str:
+        key = file_name[: -len(".json")]
+        return key if self.layout == "flat" else unquote(key)
 
     def load(self):
-        if not self.cache_overview_file.exists():
-            return {}
-        self._load_overview()
+        """
+        Load the overview and reconcile it with the data directory in one
+        scandir pass.
+        """
+        with self._overview_lock:
+            self._load_overview()
+            self._loose_keys = self._scan_data_keys()
+            data_keys = self._loose_keys | self.pack_index.keys()
+            overview_keys = self.cache_overview_data.keys()
 
-        # sync between overview and data - remove keys from overview that are not in data
-        delete_count = 0
-        for key in self.cache_overview_data:
-            if not self._get_data_file_path(key).exists():
-                delete_count += 1
+            # Entries whose data file is gone
+            missing = overview_keys - data_keys
+            if missing:
+                print(f"Deleting {len(missing)} keys from overview...")
+            for key in missing:
                 del self.cache_overview_data[key]
-        print(f"Deleting {delete_count} keys from overview...")
+            self._mark_overview_keys(missing, deleted=True)
 
-        # sync between data and overview - add keys to overview that are not in data
-        now = datetime.now().isoformat()
-        for file in self.cache_data_dir.iterdir():
-            if file.is_file() and file.name.endswith(".json"):
-                key = file.stem
-                if key not in self.cache_overview_data:
-                    self.cache_overview_data[key] = {
-                        "last_synced": now,
-                    }
+            # Data files written after the last overview flush
+            unknown = data_keys - overview_keys
+            if unknown:
+                print(f"Adding {len(unknown)} keys to overview...")
+            now = datetime.now().isoformat()
+            for key in unknown:
+                self.cache_overview_data[key] = {
+                    "last_synced": now,
+                }
+            self._mark_overview_keys(unknown)
 
-        self._save_overview()
+            if missing or unknown:
+                self._save_overview()
+            self._loaded = True
+
+    def _scan_data_keys(self) -> set[str]:
+        if not self.cache_data_dir.exists():
+            return set()
+        data_keys, pending = set(), [self.cache_data_dir]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    # d_type from scandir, no stat per file
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".json"):
+                        data_keys.add(self._decode_key(entry.name))
+        return data_keys
+
+    @contextlib.contextmanager
+    def _overview_file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.cache_overview_lock_file, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stat_overview_file(self) -> tuple[int, int] | None:
+        return _file_stat(self.cache_overview_file)
 
     def _save_overview(self):
-        with open(self.cache_overview_file, "w") as f:
-            json.dump(self.cache_overview_data, f)
+        with self._overview_lock, self._overview_file_lock():
+            # Another process saved since our last read or write, apply our
+            # changes on top of its version
+            if self._stat_overview_file() != self._overview_file_stat:
+                with open(self.cache_overview_file, "r") as f:
+                    merged = json.load(f)
+                for key in self._overview_deleted_keys:
+                    merged.pop(key, None)
+                for key in self._overview_dirty_keys:
+                    if key in self.cache_overview_data:
+                        merged[key] = self.cache_overview_data[key]
+                self.cache_overview_data.clear()
+                self.cache_overview_data.update(merged)
+
+            _atomic_write(
+                self.cache_overview_file, json.dumps(self.cache_overview_data).encode()
+            )
+            self._overview_file_stat = self._stat_overview_file()
+            self._overview_dirty_keys.clear()
+            self._overview_deleted_keys.clear()
+            self._overview_changes = 0
+            self._overview_last_flush = time.monotonic()
+
+    def _mark_overview_keys(self, keys, deleted: bool = False):
+        for key in keys:
+            if deleted:
+                self._overview_dirty_keys.discard(key)
+                self._overview_deleted_keys.add(key)
+            else:
+                self._overview_deleted_keys.discard(key)
+                self._overview_dirty_keys.add(key)
+
+    def _overview_changed(self, keys, deleted: bool = False):
+        """Record buffered overview changes and flush once a threshold is hit"""
+        self._mark_overview_keys(keys, deleted)
+        self._overview_changes += len(keys)
+        if (
+            self._overview_changes >= self.overview_flush_every
+            or time.monotonic() - self._overview_last_flush
+            >= self.overview_flush_interval
+        ):
+            self._save_overview()
+
+    def flush(self):
+        """Write buffered overview changes to disk"""
+        with self._overview_lock:
+            if self._overview_changes > 0:
+                self._save_overview()
 
     def _load_overview(self):
-        if not self.cache_overview_file.exists():
-            return {}
+        self._overview_file_stat = self._stat_overview_file()
+        if self._overview_file_stat is None:
+            self.cache_overview_data = {}
+            return self.cache_overview_data
         with open(self.cache_overview_file, "r") as f:
             self.cache_overview_data = json.load(f)
 
+    def _open_pack(self):
+        self._pack_index_stat = _file_stat(self.cache_pack_index_file)
+        if self._pack_index_stat is None:
+            return
+        with open(self.cache_pack_index_file, "r") as f:
+            index = json.load(f)
+        pack = None
+        if index["entries"]:
+            with open(self.cache_dir / index["file"], "rb") as f:
+                pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pack_file = index["file"]
+        self._pack, self.pack_index = pack, index["entries"]
+
+    def _reopen_pack_if_changed(self) -> bool:
+        # Another process compacted, its pack now holds the deleted loose files
+        if _file_stat(self.cache_pack_index_file) == self._pack_index_stat:
+            return False
+        self._open_pack()
+        return True
+
+    def _save_pack_index(self):
+        _atomic_write(
+            self.cache_pack_index_file,
+            json.dumps({"file": self._pack_file, "entries": self.pack_index}).encode(),
+        )
+
+    def _read_packed(self, key) -> bytes | None:
+        entry = self.pack_index.get(key)
+        if entry is None or self._pack is None:
+            return None
+        offset, length = entry
+        return self._pack[offset : offset + length]
+
+    def _read_loose(self, key) -> bytes | None:
+        try:
+            with open(self._get_data_file_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
     def _save_data(self, key, value):
-        if not self.cache_data_dir.exists():
-            self.cache_data_dir.mkdir(parents=True, exist_ok=True)
-        with open(self._get_data_file_path(key), "w") as f:
-            json.dump(value, f)
+        data = self.codec.encode(value)
+        file_path = self._get_data_file_path(key)
+        try:
+            _atomic_write(file_path, data)
+        except FileNotFoundError:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(file_path, data)
+        self._loose_keys.add(key)
+        if self.lru is not None:
+            self.lru.put(key, value, len(data))
 
     def _load_data(self, key):
-        file_path = self._get_data_file_path(key)
-        if not self.cache_data_dir.exists() or not file_path.exists():
+        # After load() we know whether a packed entry was overwritten since
+        if self._loaded and key in self.pack_index and key not in self._loose_keys:
+            data = self._read_packed(key)
+        else:
+            data = self._read_loose(key)
+            if data is None:
+                data = self._read_packed(key)
+        if data is None and self._reopen_pack_if_changed():
+            data = self._read_packed(key)
+        if data is None:
             return None
-        with open(file_path, "r") as f:
-            return json.load(f)
+        value = self.codec.decode(data)
+        if self.lru is not None:
+            self.lru.put(key, value, len(data))
+        return value
+
+    def contains(self, key: str) -> bool:
+        """
+        Existence check without reading the data file. After `load()` this is
+        a lookup in the in-memory overview, which `load()` reconciles with the
+        data directory.
+        """
+        if self._loaded:
+            return key in self.cache_overview_data
+        return (
+            key in self.pack_index
+            or self._get_data_file_path(key).exists()
+            or (self._reopen_pack_if_changed() and key in self.pack_index)
+        )
 
     def get(self, key):
+        if self.lru is not None:
+            hit, value = self.lru.get(key)
+            if hit:
+                return value
         return self._load_data(key)
 
     def set(self, key: str, value: dict):
         self._save_data(key, value)
 
-        self.cache_overview_data[key] = {
-            "last_synced": datetime.now().isoformat(),
-        }
+        now = datetime.now().isoformat()
+        with self._overview_lock:
+            self.cache_overview_data[key] = {
+                "last_synced": now,
+                "last_changed": now,
+            }
+            self._overview_changed([key])
+
+    def set_many(self, items: dict):
+        now = datetime.now().isoformat()
+        for key, value in items.items():
+            self._save_data(key, value)
+
+        with self._overview_lock:
+            for key in items:
+                self.cache_overview_data[key] = {
+                    "last_synced": now,
+                    "last_changed": now,
+                }
+            self._overview_changed(list(items))
 
-        self._save_overview()
+    def touch(self, key: str, **fields):
+        """Mark `key` as synced now and merge `fields` into its metadata"""
+        with self._overview_lock:
+            entry = self.cache_overview_data.get(key, {})
+            self.cache_overview_data[key] = {
+                **entry,
+                **fields,
+                "last_synced": datetime.now().isoformat(),
+            }
+            self._overview_changed([key])
+
+    def get_meta(self, key: str) -> dict | None:
+        entry = self.cache_overview_data.get(key)
+        return dict(entry) if entry is not None else None
+
+    def changed_keys(self, since: str) -> list[str]:
+        """Keys whose value was written after the ISO timestamp `since`"""
+        with self._overview_lock:
+            return [
+                key
+                for key, entry in self.cache_overview_data.items()
+                if entry.get("last_changed", entry["last_synced"]) > since
+            ]
 
     def delete(self, key: str):
-        self.cache_overview_data.pop(key, None)
-        self._save_overview()
+        with self._overview_lock:
+            self.cache_overview_data.pop(key, None)
+            self._overview_changed([key], deleted=True)
+            if key in self.pack_index:
+                del self.pack_index[key]
+                self._save_pack_index()
+        if self.lru is not None:
+            self.lru.discard(key)
+        self._loose_keys.discard(key)
         file_path = self._get_data_file_path(key)
         if file_path.exists():
             file_path.unlink()
 
     def keys(self):
-        return list(self.cache_overview_data.keys())
+        with self._overview_lock:
+            return list(self.cache_overview_data.keys())
+
+    def items(self):
+        """
+        Iterate over all `(key, value)` pairs, reading packed entries in file
+        order before any data files written since the last compaction.
+        """
+        loose_keys = self._loose_keys if self._loaded else self._scan_data_keys()
+        for key, (offset, length) in list(self.pack_index.items()):
+            if key not in loose_keys:
+                yield key, self.codec.decode(self._pack[offset : offset + length])
+        for key in list(loose_keys):
+            data = self._read_loose(key)
+            if data is not None:
+                yield key, self.codec.decode(data)
+
+    def compact(self) -> int:
+        """
+        Pack every entry into a new pack file and remove the individual data
+        files, returning the number of packed entries. The index is swapped in
+        atomically, so a crash at any point leaves a readable cache. Readers in
+        other processes pick up the new pack when a loose file they expect is
+        gone. Do not run while another process writes to the same cache.
+        """
+        with self._overview_lock:
+            loose_keys = self._scan_data_keys()
+            keys = sorted(loose_keys | self.pack_index.keys())
+            pack_file = f"pack-{time.time_ns()}.bin"
+            entries = {}
+            offset = 0
+            with open(self.cache_dir / pack_file, "wb") as f:
+                for key in keys:
+                    data = self._read_loose(key) if key in loose_keys else None
+                    if data is None:
+                        data = self._read_packed(key)
+                    if data is None:
+                        continue
+                    f.write(data)
+                    entries[key] = [offset, len(data)]
+                    offset += len(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            previous_pack_file = self._pack_file
+            self._pack_file = pack_file
+            self.pack_index = entries
+            self._save_pack_index()
+            self._open_pack()
+
+            for key in loose_keys:
+                self._get_data_file_path(key).unlink(missing_ok=True)
+            self._loose_keys = set()
+            if previous_pack_file is not None:
+                (self.cache_dir / previous_pack_file).unlink(missing_ok=True)
+        return len(entries)
+
+    def migrate_layout(self, layout: str) -> int:
+        """
+        Move every data file into `layout` ("flat" or "hashed") and return the
+        number of files moved. Files are located by where they are rather than
+        by the current layout, so an interrupted migration can simply be rerun.
+        """
+        if layout not in ("flat", "hashed"):
+            raise ValueError(f"Unknown cache layout: {layout}")
+        moves = []
+        for directory, _, file_names in os.walk(self.cache_data_dir):
+            is_top_level = directory == str(self.cache_data_dir)
+            for file_name in file_names:
+                if not file_name.endswith(".json"):
+                    continue
+                key = file_name[: -len(".json")]
+                # Files in fan-out directories have percent-encoded names
+                key = key if is_top_level else unquote(key)
+                source = Path(directory) / file_name
+                target = self._get_data_file_path(key, layout)
+                if layout == "flat" and target.parent != self.cache_data_dir:
+                    raise ValueError(f"Key {key!r} is not a safe flat file name")
+                if source != target:
+                    moves.append((source, target))
+
+        with self._overview_lock:
+            for source, target in moves:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(source, target)
+            if layout == "flat":
+                # Remove the emptied fan-out directories
+                for directory, _, _ in os.walk(self.cache_data_dir, topdown=False):
+                    if directory != str(self.cache_data_dir):
+                        os.rmdir(directory)
+                self.cache_layout_file.unlink(missing_ok=True)
+            else:
+                self.cache_layout_file.write_text(layout)
+            self.layout = layout
+        return len(moves)
+
+    def is_stale(self, key: str, ttl: float | None = None) -> bool:
+        """Whether `key` was synced more than `ttl` (default: `self.ttl`) ago"""
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is None:
+            return False
+        entry = self.cache_overview_data.get(key)
+        # Entries missing from the overview have an unknown age
+        return entry is None or entry["last_synced"] < _stale_cutoff(ttl)
+
+    def stale_keys(self, ttl: float | None = None, limit: int | None = None):
+        """Keys synced more than `ttl` ago, oldest first"""
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is None:
+            return []
+        cutoff = _stale_cutoff(ttl)
+        with self._overview_lock:
+            stale = [
+                (entry["last_synced"], key)
+                for key, entry in self.cache_overview_data.items()
+                if entry["last_synced"] < cutoff
+            ]
+        stale.sort()
+        return [key for _, key in stale[:limit]]
+
+
+class SqliteCacheController(AsyncCacheMixin):
+    """
+    Cache controller storing every entry as a row in a single SQLite file.
+
+    Drop-in for `DistributedCacheController`: lookups are indexed reads and the
+    whole cache ships as one file. The database runs in WAL mode and writes are
+    grouped into transactions committed every `commit_every` changes, after
+    `commit_interval` seconds, on `flush()` and at interpreter exit. Safe to
+    call from worker threads. `ttl` works as in `DistributedCacheController`.
+
+    `load()` reads all keys into an in-memory index for `contains()`. With
+    `bloom_capacity` set the index is a Bloom filter instead of a set, which
+    keeps memory flat for very large caches; its (rare) positives are then
+    confirmed with an indexed query. `touch()`, `get_meta()` and
+    `changed_keys()` work as in `DistributedCacheController`.
+    """
+
+    cache_file: Path
+
+    def __init__(
+        self,
+        cache_file: str | Path,
+        commit_every: int = 100,
+        commit_interval: float = 5.0,
+        codec: CacheCodec | None = None,
+        ttl: float | None = None,
+        bloom_capacity: int | None = None,
+    ):
+        if isinstance(cache_file, str):
+            cache_file = Path(cache_file)
+        self.cache_file = cache_file
+        self.codec = codec or CacheCodec()
+        self.ttl = ttl
+        self.bloom_capacity = bloom_capacity
+        self.key_index: set[str] | BloomFilter | None = None
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_synced TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_last_synced ON cache (last_synced)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cache)")}
+        # Added after the first release of this table
+        for column in ("last_changed", "meta"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE cache ADD COLUMN {column} TEXT")
+        self.conn.commit()
+        atexit.register(self.close)
+
+    def load(self):
+        # Values are read on demand, only the key index is built up front
+        with self._lock:
+            keys = [row[0] for row in self.conn.execute("SELECT key FROM cache")]
+        if self.bloom_capacity is None:
+            self.key_index = set(keys)
+        else:
+            self.key_index = BloomFilter(max(self.bloom_capacity, len(keys)))
+            for key in keys:
+                self.key_index.add(key)
+
+    def _index_keys(self, keys):
+        if self.key_index is not None:
+            for key in keys:
+                self.key_index.add(key)
+
+    def _changed(self, count: int = 1):
+        self._pending += count
+        if (
+            self._pending >= self.commit_every
+            or time.monotonic() - self._last_commit >= self.commit_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Commit the pending write transaction"""
+        with self._lock:
+            if self._pending > 0:
+                self.conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self.conn is None:
+                return
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return self.codec.decode(row[0]) if row else None
+
+    def contains(self, key: str) -> bool:
+        if isinstance(self.key_index, set):
+            return key in self.key_index
+        if self.key_index is not None and key not in self.key_index:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def set(self, key: str, value: dict):
+        self.set_many({key: value})
+
+    def set_many(self, items: dict):
+        now = datetime.now().isoformat()
+        rows = [
+            (key, self.codec.encode(value), now, now) for key, value in items.items()
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, last_synced, last_changed) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._index_keys(items)
+            self._changed(len(rows))
+
+    def touch(self, key: str, **fields):
+        """Mark `key` as synced now and merge `fields` into its metadata"""
+        with self._lock:
+            meta = self.get_meta(key) or {}
+            for column in ("last_synced", "last_changed"):
+                meta.pop(column, None)
+            meta.update(fields)
+            self.conn.execute(
+                "UPDATE cache SET last_synced = ?, meta = ? WHERE key = ?",
+                (datetime.now().isoformat(), json.dumps(meta), key),
+            )
+            self._changed()
+
+    def get_meta(self, key: str) -> dict | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_synced, last_changed, meta FROM cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        last_synced, last_changed, meta = row
+        return {
+            **(json.loads(meta) if meta else {}),
+            "last_synced": last_synced,
+            "last_changed": last_changed or last_synced,
+        }
+
+    def changed_keys(self, since: str) -> list[str]:
+        """Keys whose value was written after the ISO timestamp `since`"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key FROM cache WHERE COALESCE(last_changed, last_synced) > ?",
+                (since,),
+            )
+            return [row[0] for row in rows]
+
+    def delete(self, key: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            if isinstance(self.key_index, set):
+                self.key_index.discard(key)
+            self._changed()
+
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT key FROM cache")]
+
+    def items(self):
+        """Iterate over all `(key, value)` pairs in key order with one query"""
+        with self._lock:
+            cursor = self.conn.execute("SELECT key, value FROM cache ORDER BY key")
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for key, value in rows:
+                yield key, self.codec.decode(value)
+
+    def is_stale(self, key: str, ttl: float | None = None) -> bool:
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is None:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_synced FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row is None or row[0] < _stale_cutoff(ttl)
+
+    def stale_keys(self, ttl: float | None = None, limit: int | None = None):
+        """Keys synced more than `ttl` ago, oldest first"""
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is None:
+            return []
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key FROM cache WHERE last_synced < ? "
+                "ORDER BY last_synced LIMIT ?",
+                (_stale_cutoff(ttl), -1 if limit is None else limit),
+            )
+            return [row[0] for row in rows]
+
+    def import_directory(self, cache_dir: str | Path, batch_size: int = 1000):
+        """
+        One-shot migration from a `DistributedCacheController` directory,
+        keeping each entry's `last_synced` and `last_changed` times and its
+        `touch()` metadata. Returns the number of entries imported.
+        """
+        # Reuse the directory controller to read either layout
+        source = DistributedCacheController(cache_dir)
+        source._load_overview()
+        overview = source.cache_overview_data
+
+        now = datetime.now().isoformat()
+        imported = 0
+        rows = []
+        loose_keys = source._scan_data_keys()
+        for key in loose_keys | source.pack_index.keys():
+            if key in loose_keys:
+                value = source._read_loose(key)
+            else:
+                value = source._read_packed(key)
+            if self.codec.compression is not None:
+                value = self.codec.encode(self.codec.decode(value))
+            meta = dict(overview.get(key, {}))
+            last_synced = meta.pop("last_synced", now)
+            last_changed = meta.pop("last_changed", last_synced)
+            meta_json = json.dumps(meta) if meta else None
+            rows.append((key, value, last_synced, last_changed, meta_json))
+            if len(rows) >= batch_size:
+                imported += self._import_rows(rows)
+                rows = []
+        imported += self._import_rows(rows)
+        return imported
+
+    def _import_rows(self, rows: list[tuple]):
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache "
+                "(key, value, last_synced, last_changed, meta) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_keys(row[0] for row in rows)
+            self.conn.commit()
+        return len(rows)
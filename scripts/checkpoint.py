@@ -0,0 +1,88 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of completed cache keys.
+
+    Keys are appended one JSON string per line and fsync'd in groups of
+    `fsync_every` records (or after `fsync_interval` seconds), so a resumed
+    sync can skip finished work from an in-memory set without touching the
+    cache. A crash loses at most one unsynced group, which is then simply
+    re-checked against the cache. The journal only serves interrupted runs:
+    call `clear()` once a sync has completed.
+    """
+
+    file: Path
+
+    def __init__(
+        self, file: str | Path, fsync_every: int = 50, fsync_interval: float = 5.0
+    ):
+        if isinstance(file, str):
+            file = Path(file)
+        self.file = file
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self.completed: set[str] = set()
+        self._handle = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def load(self):
+        self.completed = set()
+        if not self.file.exists():
+            return self.completed
+        with open(self.file, "r") as f:
+            for line in f:
+                try:
+                    self.completed.add(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn write from a crash, the key gets re-checked instead
+                    continue
+        return self.completed
+
+    def record(self, key: str):
+        if key in self.completed:
+            return
+        self.completed.add(key)
+        if self._handle is None:
+            self._handle = open(self.file, "a")
+        self._handle.write(json.dumps(key) + "\n")
+        self._pending += 1
+        if (
+            self._pending >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """Flush and fsync pending records"""
+        if self._handle is None or self._pending == 0:
+            return
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        self.sync()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def clear(self):
+        """Forget all completed keys and delete the journal file"""
+        self.close()
+        self.completed = set()
+        self.file.unlink(missing_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def __len__(self) -> int:
+        return len(self.completed)
@@ -0,0 +1,26 @@
+# compact_cache.py
+import argparse
+import time
+from scripts.cache import DistributedCacheController
+
+
+def main(cache_dir: str):
+    start = time.perf_counter()
+    cache_controller = DistributedCacheController(cache_dir)
+    cache_controller.load()
+    count = cache_controller.compact()
+    print(
+        f"Packed {count} entries in {cache_dir} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pack a read-mostly DistributedCacheController directory into one file"
+    )
+    parser.add_argument(
+        "cache_dir", help="e.g. temp/sync_myplan_courses/myplan_search_result"
+    )
+    args = parser.parse_args()
+    main(args.cache_dir)
@@ -56,8 +56,8 @@ def get_course_enroll_count(course_detail: dict) -> int:
 
 
 async def main():
-    client = MyPlanApiClient()
-    course_detail = await client.get_course_detail("INFO 200")
+    async with MyPlanApiClient() as client:
+        course_detail = await client.get_course_detail("INFO 200")
 
     # print(course_detail)
 
@@ -1,37 +1,41 @@
 # sync_myplan_course_details.py
+import argparse
 import asyncio
 from dataclasses import asdict
-from scripts.data_sync_orchestrator import DataSyncOrchestrator, SyncConfig
+from scripts.data_sync_orchestrator import (
+    DataSyncOrchestrator,
+    FetchResult,
+    SyncConfig,
+)
 from scripts.myplan_api import MyPlanApiClient
-from scripts.db_queries import get_myplan_courses
+from scripts.db_queries import count_myplan_courses, stream_myplan_courses
 from scripts.myplan_local_cache import DistributedCacheController
+from scripts.rate_limiter import RateLimiter, DEFAULT_HOST_LIMITS
 
+CACHE_DIR = "temp/sync_myplan_courses/myplan_course_details"
+# Enrollment data changes daily, older details are refreshed by --refresh-stale
+CACHE_TTL = 24 * 60 * 60
 
-async def main():
-    # Minimal configuration
-    config = SyncConfig(
-        name="MyPlan Course Details",
-        batch_delay=0,
-        batch_size=5,
-        cache_location="temp/sync_myplan_courses/myplan_course_details",
-    )
 
-    cache_controller = DistributedCacheController(
-        "temp/sync_myplan_courses/myplan_course_details"
-    )
-    cache_controller.load()
+def get_cache_key(course):
+    return course["code"]
 
-    # Initialize orchestrator and client
-    orchestrator = DataSyncOrchestrator(config)
-    client = MyPlanApiClient()
 
-    # Get data to sync
-    myplan_courses = get_myplan_courses()
+def build_sync_args(
+    client: MyPlanApiClient,
+    cache_controller: DistributedCacheController | None = None,
+) -> dict:
+    if cache_controller is None:
+        cache_controller = DistributedCacheController(CACHE_DIR, ttl=CACHE_TTL)
+        cache_controller.load()
 
     # Define sync behavior
-    async def fetch_courses(course):
-        d = await client.get_course_detail(course["code"])
-        return d
+    async def fetch_courses(course, validators=None):
+        # Conditional request with the validators stored on the last fetch
+        d, new_validators = await client.get_course_detail_conditional(
+            course["code"], validators=validators
+        )
+        return FetchResult(d, d is None, new_validators)
 
     def should_skip_empty(subject_area, courses):
         return not courses  # Skip if no courses found
@@ -39,17 +43,130 @@ async def main():
     def transform_courses(course_detail):
         return course_detail
 
-    # Run the sync
-    await orchestrator.sync(
-        items=myplan_courses,
+    return dict(
         fetch_func=fetch_courses,
         cache_controller=cache_controller,
-        get_cache_key=lambda sa: sa["code"],
-        get_display_name=lambda sa: sa["code"],
+        get_cache_key=get_cache_key,
+        get_display_name=get_cache_key,
         should_skip=should_skip_empty,
         transform_result=transform_courses,
     )
 
 
+def setup_shard(shard: int, shards: int) -> dict:
+    # Each worker process gets an equal slice of the request budget, the client
+    # lives as long as the worker
+    client = MyPlanApiClient(
+        rate_limiter=RateLimiter(DEFAULT_HOST_LIMITS).scaled(1 / shards),
+        raise_congestion_errors=True,
+    )
+    return build_sync_args(client)
+
+
+async def main(
+    retry_dead_letters: bool = False,
+    shards: int = 1,
+    refresh_stale: bool = False,
+    fetch_budget: int | None = None,
+):
+    # Minimal configuration
+    config = SyncConfig(
+        name="MyPlan Course Details",
+        batch_delay=0,
+        batch_size=5,
+        concurrency_mode="adaptive",
+        max_batch_size=20,
+        cache_location=CACHE_DIR,
+        max_retries=3,
+        dead_letter_file="temp/sync_myplan_courses/myplan_course_details_dead_letters.jsonl",
+        write_behind=True,
+        quiet=True,
+        # A refresh run re-fetches keys a previous full run already journaled
+        checkpoint_file=(
+            None if refresh_stale else f"{CACHE_DIR}/sync_checkpoint.jsonl"
+        ),
+        refresh_stale=refresh_stale,
+        fetch_budget=fetch_budget,
+        # Unchanged details only get their sync time bumped, so the DB upload
+        # of changed keys stays small
+        conditional_fetch=True,
+        skip_unchanged=True,
+    )
+
+    # Initialize orchestrator
+    orchestrator = DataSyncOrchestrator(config)
+
+    # Get data to sync
+    cache_controller = None
+    if retry_dead_letters:
+        myplan_courses = orchestrator.dead_letter_items()
+        total = len(myplan_courses)
+    elif refresh_stale:
+        # Only the stale slice, oldest first, within the fetch budget. Shard
+        # workers load their own controller, a single process reuses this one
+        cache_controller = DistributedCacheController(CACHE_DIR, ttl=CACHE_TTL)
+        cache_controller.load()
+        myplan_courses = [
+            {"code": key} for key in cache_controller.stale_keys(limit=fetch_budget)
+        ]
+        total = len(myplan_courses)
+    else:
+        # Stream rows so fetching starts while the cursor is still reading
+        myplan_courses = stream_myplan_courses()
+        total = count_myplan_courses()
+
+    # Run the sync
+    if shards > 1:
+        await orchestrator.sync_sharded(
+            items=myplan_courses,
+            get_cache_key=get_cache_key,
+            setup=setup_shard,
+            shards=shards,
+            total=total,
+        )
+    else:
+        async with MyPlanApiClient(
+            rate_limiter=RateLimiter(DEFAULT_HOST_LIMITS),
+            raise_congestion_errors=True,
+        ) as client:
+            await orchestrator.sync(
+                items=myplan_courses,
+                **build_sync_args(client, cache_controller),
+                total=total,
+            )
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Sync MyPlan course details")
+    parser.add_argument(
+        "--retry-dead-letters",
+        action="store_true",
+        help="Only re-process courses that failed in previous runs",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of worker processes to split the sync across",
+    )
+    parser.add_argument(
+        "--refresh-stale",
+        action="store_true",
+        help="Re-fetch cached courses synced more than a day ago, oldest first",
+    )
+    parser.add_argument(
+        "--fetch-budget",
+        type=int,
+        default=None,
+        help="Maximum number of courses to fetch in this run",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            retry_dead_letters=args.retry_dead_letters,
+            shards=args.shards,
+            refresh_stale=args.refresh_stale,
+            fetch_budget=args.fetch_budget,
+        )
+    )
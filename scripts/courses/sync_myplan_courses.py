@@ -29,8 +29,6 @@ from rich.table import Table
 from rich.text import Text
 from rich.live import Live
 from rich.align import Align
-from dataclasses import asdict
-import json
 import time
 
 from scripts.utils import duplicate_check
@@ -273,7 +271,7 @@ def sync_myplan_sa_courses(
         {
             "code": course.code,
             "quarter": course.termId if course.termId else "null",
-            "data": json.dumps(asdict(course)),
+            "data": course.to_json(),
             "subjectAreaCode": subject_area_code,
         }
         for course in courses_to_insert
@@ -283,7 +281,7 @@ def sync_myplan_sa_courses(
         {
             "code": course.code,
             "quarter": course.termId if course.termId else "null",
-            "data": json.dumps(asdict(course)),
+            "data": course.to_json(),
         }
         for course in courses_to_update
     ]
@@ -300,7 +298,9 @@ def sync_myplan_sa_courses(
     return courses_to_insert, courses_to_update
 
 
-async def sync_myplan_subject_area(subject_area_code: str, all_myplan_courses):
+async def sync_myplan_subject_area(
+    subject_area_code: str, all_myplan_courses, client: MyPlanApiClient
+):
     global shutdown_requested
 
     # Check for shutdown request before starting
@@ -312,7 +312,7 @@ async def sync_myplan_subject_area(subject_area_code: str, all_myplan_courses):
 
     start_time = datetime.now()
 
-    if cache_controller.get(subject_area_code):
+    if cache_controller.contains(subject_area_code):
         console.print(f"🔄 [yellow]Skipping {subject_area_code} due to cache[/yellow]")
         return
 
@@ -326,7 +326,6 @@ async def sync_myplan_subject_area(subject_area_code: str, all_myplan_courses):
     )
 
     try:
-        client = MyPlanApiClient()
         console.print(f"🌐 Fetching courses from MyPlan API for {subject_area_code}...")
         new_courses = await client.search_courses(f"{subject_area_code}")
 
@@ -449,8 +448,8 @@ async def main_test():
     ]
     console.print(f"📋 Found {len(sa_courses)} courses for {subject_area_code} from DB")
 
-    client = MyPlanApiClient()
-    new_courses = await client.search_courses(f"{subject_area_code}")
+    async with MyPlanApiClient() as client:
+        new_courses = await client.search_courses(f"{subject_area_code}")
     # filter out courses not in the subject area
     new_courses = [
         course for course in new_courses if course.subject == subject_area_code
@@ -569,47 +568,53 @@ async def main():
     failed_syncs = 0
     skipped_syncs = 0
 
-    # Progress tracking
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-        console=console,
-    ) as progress:
-        overall_task = progress.add_task(
-            f"[cyan]Processing {len(subject_areas)} subject areas...",
-            total=len(subject_areas),
-        )
+    # One pooled client for all subject areas
+    async with MyPlanApiClient() as client:
+        # Progress tracking
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TimeElapsedColumn(),
+            console=console,
+        ) as progress:
+            overall_task = progress.add_task(
+                f"[cyan]Processing {len(subject_areas)} subject areas...",
+                total=len(subject_areas),
+            )
 
-        for i, sa in enumerate(subject_areas):
-            # Check for shutdown request before processing each subject area
-            if shutdown_requested:
-                console.print(
-                    f"\n[bold yellow]🛑 Shutdown requested. Stopping at {sa['code']} ({i + 1}/{len(subject_areas)})[/bold yellow]"
+            for i, sa in enumerate(subject_areas):
+                # Check for shutdown request before processing each subject area
+                if shutdown_requested:
+                    console.print(
+                        f"\n[bold yellow]🛑 Shutdown requested. Stopping at {sa['code']} ({i + 1}/{len(subject_areas)})[/bold yellow]"
+                    )
+                    skipped_syncs = len(subject_areas) - i
+                    break
+
+                progress.update(
+                    overall_task,
+                    description=f"[cyan]Processing {sa['code']} ({i + 1}/{len(subject_areas)})",
                 )
-                skipped_syncs = len(subject_areas) - i
-                break
-
-            progress.update(
-                overall_task,
-                description=f"[cyan]Processing {sa['code']} ({i + 1}/{len(subject_areas)})",
-            )
 
-            try:
-                await sync_myplan_subject_area(sa["code"], get_myplan_courses())
-                if (
-                    not shutdown_requested
-                ):  # Only count as successful if not interrupted
-                    successful_syncs += 1
-                progress.advance(overall_task)
-            except Exception as e:
-                if not shutdown_requested:  # Only count as failed if not interrupted
-                    failed_syncs += 1
-                    console.print(f"❌ [red]Failed to sync {sa['code']}: {e}[/red]")
-                progress.advance(overall_task)
-                continue
+                try:
+                    await sync_myplan_subject_area(
+                        sa["code"], get_myplan_courses(), client
+                    )
+                    if (
+                        not shutdown_requested
+                    ):  # Only count as successful if not interrupted
+                        successful_syncs += 1
+                    progress.advance(overall_task)
+                except Exception as e:
+                    if (
+                        not shutdown_requested
+                    ):  # Only count as failed if not interrupted
+                        failed_syncs += 1
+                        console.print(f"❌ [red]Failed to sync {sa['code']}: {e}[/red]")
+                    progress.advance(overall_task)
+                    continue
 
     end_time = datetime.now()
     duration = end_time - start_time
@@ -2,7 +2,10 @@ from scripts.cache import DistributedCacheController
 from scripts.myplan_local_cache import myplan_search_result_cache_controller
 from scripts.db_queries import get_subject_areas_from_db, insert_myplan_courses
 from scripts.db import with_db, MYPLAN_COURSES_TABLE
+import argparse
 import json
+import os
+from pathlib import Path
 from rich import print
 
 
@@ -11,6 +14,34 @@ myplan_details_cache_controller = DistributedCacheController(
 )
 myplan_details_cache_controller.load()
 
+# last_changed of every course as of its last upload, used by --changed-only.
+# Comparing per key instead of against a time watermark also catches entries
+# whose overview update reached disk after an earlier upload had started.
+UPLOAD_LEDGER_FILE = Path(
+    "temp/sync_myplan_courses/myplan_course_details_uploaded.json"
+)
+
+
+def load_upload_ledger() -> dict[str, str]:
+    if not UPLOAD_LEDGER_FILE.exists():
+        return {}
+    with open(UPLOAD_LEDGER_FILE) as f:
+        return json.load(f)
+
+
+def save_upload_ledger(ledger: dict[str, str]):
+    UPLOAD_LEDGER_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = UPLOAD_LEDGER_FILE.with_name(f".{UPLOAD_LEDGER_FILE.name}.{os.getpid()}")
+    with open(tmp_file, "w") as f:
+        json.dump(ledger, f)
+    os.replace(tmp_file, UPLOAD_LEDGER_FILE)
+
+
+def last_changed(course_code: str) -> str:
+    meta = myplan_details_cache_controller.get_meta(course_code)
+    return meta.get("last_changed", meta["last_synced"])
+
+
 sql_myplan_update_course_detail = f"""
 UPDATE {MYPLAN_COURSES_TABLE}
 SET "detail" = %s::jsonb
@@ -19,7 +50,7 @@ WHERE code = %s
 
 
 @with_db
-def upload_courses_to_db(conn, cursor):
+def upload_courses_to_db(conn, cursor, changed_only: bool = False):
     # ------------------------------------------------------------
     # upload local cache courses to db
     # ------------------------------------------------------------
@@ -29,7 +60,22 @@ def upload_courses_to_db(conn, cursor):
 
     print("\n--------\nStarting course upload from local cache to DB...\n--------\n")
 
-    course_codes = myplan_details_cache_controller.keys()
+    # Versions are taken before reading the values, so a value rewritten
+    # meanwhile is recorded as older than it is and uploaded again next time
+    versions = {
+        course_code: last_changed(course_code)
+        for course_code in myplan_details_cache_controller.keys()
+    }
+    ledger = load_upload_ledger()
+    if changed_only:
+        print("Only uploading courses changed since their last upload")
+        course_codes = [
+            course_code
+            for course_code, version in versions.items()
+            if ledger.get(course_code) != version
+        ]
+    else:
+        course_codes = list(versions)
 
     print(f"Found {len(course_codes)} courses to process")
 
@@ -50,6 +96,7 @@ def upload_courses_to_db(conn, cursor):
         total_batches += 1
         total_courses += len(batch)
         conn.commit()
+        ledger.update((course_code, versions[course_code]) for course_code in batch)
         print(
             f"Uploaded batch {total_batches} ({i + 1}-{min(i + batch_size, len(course_codes))} of {len(course_codes)} courses)"
         )
@@ -59,9 +106,20 @@ def upload_courses_to_db(conn, cursor):
     print(f"Total batches processed: {total_batches}")
     print("--------\n")
 
+    save_upload_ledger(ledger)
+
 
 def main():
-    upload_courses_to_db()
+    parser = argparse.ArgumentParser(
+        description="Upload cached MyPlan course details to the DB"
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only upload courses whose details changed since the last upload",
+    )
+    args = parser.parse_args()
+    upload_courses_to_db(changed_only=args.changed_only)
 
 
 if __name__ == "__main__":
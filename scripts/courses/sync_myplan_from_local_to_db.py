@@ -13,11 +13,9 @@ def check_subjects_in_db():
     db_subject_areas_map = {sa["code"]: sa for sa in db_subject_areas}
 
     unique_subject_map = {}
-    for i, key in enumerate(list(myplan_search_result_cache_controller.keys())):
-        print(
-            f"Processing {i} of {len(myplan_search_result_cache_controller.keys())}: {key}..."
-        )
-        courses = myplan_search_result_cache_controller.get(key)
+    total_keys = len(myplan_search_result_cache_controller.keys())
+    for i, (key, courses) in enumerate(myplan_search_result_cache_controller.items()):
+        print(f"Processing {i} of {total_keys}: {key}...")
         for course in courses:
             subject = course["subject"]
             if subject not in unique_subject_map:
@@ -52,8 +50,7 @@ def upload_courses_to_db(conn, cursor):
 
     all_course_map = {}
     count = 0
-    for i, key in enumerate(list(myplan_search_result_cache_controller.keys())):
-        courses = myplan_search_result_cache_controller.get(key)
+    for key, courses in myplan_search_result_cache_controller.items():
         for course in courses:
             all_course_map[course["id"]] = course
             # all_course_map[f"{course['code']}-{course['termId']}"] = course
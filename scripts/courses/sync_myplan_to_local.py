@@ -21,7 +21,6 @@ from rich.table import Table
 from rich.text import Text
 from rich.live import Live
 from rich.align import Align
-from dataclasses import asdict
 import time
 
 from scripts.utils import duplicate_check
@@ -94,7 +93,6 @@ def print_stats(stats):
 
 async def main():
     start_time = time.time()
-    client = MyPlanApiClient()
     subject_areas = get_subject_areas_from_db()
 
     # Initialize statistics
@@ -114,64 +112,70 @@ async def main():
         )
     )
 
-    # Create progress bar
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        MofNCompleteColumn(),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-        console=console,
-    ) as progress:
-        task = progress.add_task(
-            "[cyan]Processing subject areas...", total=stats["total"]
-        )
-
-        for sa in subject_areas:
-            if shutdown_requested:
-                console.print(
-                    "\n[bold yellow]⚠️  Shutdown requested, stopping gracefully...[/bold yellow]"
-                )
-                break
+    # Searches share one pooled client
+    async with MyPlanApiClient() as client:
+        # Create progress bar
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            MofNCompleteColumn(),
+            BarColumn(),
+            TaskProgressColumn(),
+            TimeElapsedColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task(
+                "[cyan]Processing subject areas...", total=stats["total"]
+            )
 
-            progress.update(task, description=f"[cyan]Processing {sa['code']}...")
+            for sa in subject_areas:
+                if shutdown_requested:
+                    console.print(
+                        "\n[bold yellow]⚠️  Shutdown requested, stopping gracefully...[/bold yellow]"
+                    )
+                    break
 
-            if myplan_search_result_cache_controller.get(sa["code"]) is not None:
-                console.print(f"[dim]⏭️  Skipping {sa['code']} (already cached)[/dim]")
-                stats["skipped"] += 1
-                progress.advance(task)
-                continue
+                progress.update(task, description=f"[cyan]Processing {sa['code']}...")
 
-            try:
-                courses = await client.search_courses(sa["quotedCode"])
-                if not courses:
+                if myplan_search_result_cache_controller.contains(sa["code"]):
                     console.print(
-                        f"[dim]⏭️  Skipping {sa['code']} (no courses found)[/dim]"
+                        f"[dim]⏭️  Skipping {sa['code']} (already cached)[/dim]"
                     )
                     stats["skipped"] += 1
                     progress.advance(task)
                     continue
 
-                myplan_search_result_cache_controller.set(
-                    sa["code"], [asdict(c) for c in courses]
-                )
+                try:
+                    courses = await client.search_courses(sa["quotedCode"])
+                    if not courses:
+                        console.print(
+                            f"[dim]⏭️  Skipping {sa['code']} (no courses found)[/dim]"
+                        )
+                        stats["skipped"] += 1
+                        progress.advance(task)
+                        continue
+
+                    myplan_search_result_cache_controller.set(
+                        sa["code"], [c.to_dict() for c in courses]
+                    )
 
-                course_count = len(courses) if courses else 0
-                stats["total_courses"] += course_count
-                stats["processed"] += 1
+                    course_count = len(courses) if courses else 0
+                    stats["total_courses"] += course_count
+                    stats["processed"] += 1
 
-                console.print(
-                    f"[green]✅ {sa['code']}[/green] - Found [bold]{course_count}[/bold] courses"
-                )
+                    console.print(
+                        f"[green]✅ {sa['code']}[/green] - Found [bold]{course_count}[/bold] courses"
+                    )
 
-                await asyncio.sleep(1)
+                    await asyncio.sleep(1)
 
-            except Exception as e:
-                console.print(f"[red]❌ Error processing {sa['code']}: {str(e)}[/red]")
-                stats["errors"] += 1
+                except Exception as e:
+                    console.print(
+                        f"[red]❌ Error processing {sa['code']}: {str(e)}[/red]"
+                    )
+                    stats["errors"] += 1
 
-            progress.advance(task)
+                progress.advance(task)
 
     # Calculate final statistics
     end_time = time.time()
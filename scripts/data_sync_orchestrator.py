@@ -1,10 +1,27 @@
 # sync_orchestrator.py
 import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import queue
 import signal
 import sys
 import time
-from typing import List, Dict, Any, Callable, Optional, TypeVar, Generic
-from dataclasses import dataclass, asdict
+import zlib
+from typing import (
+    List,
+    Dict,
+    Any,
+    AsyncIterable,
+    Callable,
+    Iterable,
+    Optional,
+    TypeVar,
+    Generic,
+)
+from dataclasses import dataclass, asdict, field, fields, replace
 from rich.console import Console
 from rich.progress import (
     Progress,
@@ -18,8 +35,39 @@ from rich.progress import (
 from rich.panel import Panel
 from rich.table import Table
 
+from scripts.adaptive_concurrency import (
+    AdaptiveConcurrencyController,
+    is_congestion_error,
+)
+from scripts.checkpoint import CheckpointJournal
+from scripts.event_log import JsonlEventLog
+from scripts.metrics import LatencyHistogram, RollingRate
+from scripts.item_source import PrefetchedItems
+from scripts.write_behind import WriteBehindWriter
+from scripts.retry import DeadLetterQueue, backoff_delay, is_retryable_error
+
 T = TypeVar("T")
 
+# Pipeline stages with latency histograms in SyncStats
+STAGES = ("cache_check", "fetch", "transform", "cache_write")
+
+# Cache metadata maintained by the cache controller, not passed to fetch_func
+_SYNC_META_FIELDS = ("last_synced", "last_changed")
+
+
+@dataclass
+class FetchResult:
+    """
+    Optional return type of fetch_func for conditional fetches: `data` is the
+    response, `not_modified` is set when the server answered 304, and
+    `validators` (e.g. etag, last_modified) are stored with the cache entry
+    and passed back to fetch_func on the next refresh.
+    """
+
+    data: Any = None
+    not_modified: bool = False
+    validators: Dict[str, str] = field(default_factory=dict)
+
 
 @dataclass
 class SyncConfig:
@@ -28,8 +76,58 @@ class SyncConfig:
     name: str  # Display name for the sync operation
     batch_delay: float = 1.0  # Delay between API calls
     batch_size: int = 1  # Number of concurrent operations per batch
+    prefetch_size: int = 100  # Items read ahead from the item source
+    # "batch" processes items in lock-step batches, "window" keeps batch_size
+    # operations in flight and starts the next item as soon as a slot frees up,
+    # "adaptive" starts at batch_size and tunes the window with AIMD between
+    # min_batch_size and max_batch_size based on latency and 429/5xx errors
+    concurrency_mode: str = "batch"
+    min_batch_size: int = 1
+    max_batch_size: int = 32
+    # Optional RateLimiter acquired before every fetch, keyed by rate_limit_key
+    # (a host or URL). Leave unset when fetch_func is already rate limited.
+    rate_limiter: Optional[Any] = None
+    rate_limit_key: Optional[str] = None
+    # Per-item retries with exponential backoff and jitter. Only errors accepted
+    # by is_retryable (default: timeouts, connection errors, 429/5xx) are retried.
+    max_retries: int = 0
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 30.0
+    is_retryable: Optional[Callable[[Exception], bool]] = None
+    # JSON-lines file collecting items that failed for good
+    dead_letter_file: Optional[str] = None
+    # Append-only journal of completed keys used to resume an interrupted sync,
+    # deleted once a sync completes. Keep it inside the cache directory so
+    # deleting the cache also drops it.
+    checkpoint_file: Optional[str] = None
+    checkpoint_fsync_every: int = 50
+    # Hand cache writes to a bounded writer task that flushes them in batches on
+    # a worker thread, so disk I/O overlaps with fetching
+    write_behind: bool = False
+    write_batch_size: int = 50
+    write_flush_interval: float = 1.0
+    write_queue_size: int = 200
+    # Re-fetch cached items the cache controller reports as stale (is_stale),
+    # using refresh_ttl seconds or the cache's own ttl
+    refresh_stale: bool = False
+    refresh_ttl: Optional[float] = None
+    # Maximum number of items fetched this run, the rest are deferred (counted
+    # as skipped) so a cron run costs a fixed number of requests
+    fetch_budget: Optional[int] = None
+    # Call fetch_func(item, validators) with the metadata stored for a stale
+    # entry, so it can send a conditional request and return a FetchResult
+    conditional_fetch: bool = False
+    # Store a hash of each fetched response and, when a refresh returns the
+    # same content, only mark the entry as synced: transform and cache write
+    # are skipped and the entry's last_changed is kept
+    skip_unchanged: bool = False
     show_progress: bool = True
     show_stats: bool = True
+    # Only update counters and the progress bar instead of printing a line per
+    # item (errors are still printed)
+    quiet: bool = False
+    # Optional JSON-lines log of per-item events, written from a background thread
+    event_log_file: Optional[str] = None
     cache_location: Optional[str] = None
 
 
@@ -44,6 +142,36 @@ class SyncStats:
     total_items_found: int = 0
     total_time: float = 0.0
     concurrent_batches: int = 0
+    retries: int = 0
+    resumed: int = 0
+    refreshed: int = 0
+    unchanged: int = 0
+    deferred: int = 0
+    dead_lettered: int = 0
+    items_per_sec: float = 0.0  # Rolling rate over the last few seconds
+    stage_latency: Dict[str, LatencyHistogram] = field(
+        default_factory=lambda: {stage: LatencyHistogram() for stage in STAGES}
+    )
+
+    def record_latency(self, stage: str, seconds: float):
+        self.stage_latency[stage].record(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Machine-readable stats, with p50/p95/p99 per pipeline stage"""
+        data = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name != "stage_latency"
+        }
+        data["avg_time"] = self.avg_time
+        data["overall_items_per_sec"] = (
+            self.total / self.total_time if self.total_time > 0 else 0
+        )
+        data["stage_latency"] = {
+            stage: histogram.to_dict()
+            for stage, histogram in self.stage_latency.items()
+        }
+        return data
 
     @property
     def avg_time(self) -> float:
@@ -54,6 +182,22 @@ class SyncStats:
         return self.total_items_found / self.processed if self.processed > 0 else 0
 
 
+@dataclass
+class _Completion:
+    """A fetched item, recorded as processed once its result is cached"""
+
+    item: Any
+    display_name: str
+    item_count: int
+    attempts: int
+    is_refresh: bool
+
+
+def shard_for_key(key: str, shards: int) -> int:
+    """Stable shard index for a cache key, the same in every process and run"""
+    return zlib.crc32(key.encode()) % shards
+
+
 class DataSyncOrchestrator(Generic[T]):
     """Generic orchestrator for syncing data with caching and progress tracking"""
 
@@ -62,6 +206,35 @@ class DataSyncOrchestrator(Generic[T]):
         self.console = Console()
         self.shutdown_requested = False
         self.stats = SyncStats()
+        self.throughput = RollingRate()
+        self.concurrency_controller: Optional[AdaptiveConcurrencyController] = None
+        if config.concurrency_mode == "adaptive":
+            self.concurrency_controller = AdaptiveConcurrencyController(
+                initial_limit=config.batch_size,
+                min_limit=config.min_batch_size,
+                max_limit=config.max_batch_size,
+            )
+
+        self.dead_letters: Optional[DeadLetterQueue] = None
+        if config.dead_letter_file:
+            self.dead_letters = DeadLetterQueue(config.dead_letter_file)
+            self.dead_letters.load()
+
+        self.writer: Optional[WriteBehindWriter] = None
+        # Fetched items waiting for write-behind to persist their result
+        self.pending_writes: Dict[str, _Completion] = {}
+        self.fetches_started = 0
+        self.event_log: Optional[JsonlEventLog] = None
+        # Set in shard worker processes, where the parent owns the dead letters
+        self.is_shard_worker = False
+        # Adaptive concurrency state reported by each sync_sharded worker
+        self.shard_concurrency: Dict[int, Dict[str, Any]] = {}
+        self.checkpoint: Optional[CheckpointJournal] = None
+        if config.checkpoint_file:
+            self.checkpoint = CheckpointJournal(
+                config.checkpoint_file, fsync_every=config.checkpoint_fsync_every
+            )
+            self.checkpoint.load()
 
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -80,9 +253,13 @@ class DataSyncOrchestrator(Generic[T]):
             self.console.print("\n[bold red]🛑 Force exit requested[/bold red]")
             sys.exit(1)
 
+    def dead_letter_items(self) -> List[Any]:
+        """Items that failed for good in previous runs, for --retry-dead-letters"""
+        return self.dead_letters.items() if self.dead_letters is not None else []
+
     async def sync(
         self,
-        items: List[T],
+        items: Iterable[T] | AsyncIterable[T],
         fetch_func: Callable[[T], Any],  # Async function to fetch data
         cache_controller: Any,  # Cache controller with get/set methods
         get_cache_key: Callable[[T], str],  # Function to get cache key from item
@@ -91,55 +268,306 @@ class DataSyncOrchestrator(Generic[T]):
         transform_result: Optional[
             Callable[[Any], Any]
         ] = None,  # Transform before caching
+        total: Optional[int] = None,  # Item count for sources without len()
     ) -> SyncStats:
         """
         Generic sync method
 
         Args:
-            items: List of items to process
+            items: Items to process - a list, any iterable/generator, or an async
+                iterable such as a streaming database cursor. Items are read ahead
+                at most prefetch_size at a time.
             fetch_func: Async function that takes an item and returns data
             cache_controller: Object with get(key) and set(key, value) methods
             get_cache_key: Function to extract cache key from item
             get_display_name: Function to extract display name from item
             should_skip: Optional function to determine if item should be skipped
             transform_result: Optional function to transform result before caching
+            total: Optional expected item count used for progress when items has
+                no len(); updated to the real count once the source is exhausted
         """
         start_time = time.time()
-        self.stats.total = len(items)
+        self.stats.total = len(items) if hasattr(items, "__len__") else total or 0
 
         self.console.print(
             Panel(
-                f"Starting {self.config.name} sync for [bold cyan]{self.stats.total}[/bold cyan] items\n"
-                f"Batch size: [bold blue]{self.config.batch_size}[/bold blue] concurrent operations",
+                f"Starting {self.config.name} sync for [bold cyan]{self.stats.total or 'streamed'}[/bold cyan] items\n"
+                f"Batch size: [bold blue]{self.config.batch_size}[/bold blue] concurrent operations "
+                f"([bold blue]{self.config.concurrency_mode}[/bold blue] mode)",
                 title=f"🚀 {self.config.name} Sync Started",
                 border_style="green",
             )
         )
 
-        if self.config.show_progress:
-            await self._sync_with_progress(
-                items,
-                fetch_func,
-                cache_controller,
-                get_cache_key,
-                get_display_name,
-                should_skip,
-                transform_result,
+        if self.config.event_log_file:
+            self.event_log = JsonlEventLog(self.config.event_log_file)
+
+        try:
+            if self.config.show_progress:
+                await self._sync_with_progress(
+                    items,
+                    fetch_func,
+                    cache_controller,
+                    get_cache_key,
+                    get_display_name,
+                    should_skip,
+                    transform_result,
+                )
+            else:
+                await self._sync_without_progress(
+                    items,
+                    fetch_func,
+                    cache_controller,
+                    get_cache_key,
+                    get_display_name,
+                    should_skip,
+                    transform_result,
+                )
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+            if self.event_log is not None:
+                self.event_log.close()
+                self.event_log = None
+
+        # Shard workers share the journal, the parent clears it for all of them
+        if (
+            self.checkpoint is not None
+            and not self.shutdown_requested
+            and not self.is_shard_worker
+        ):
+            self.checkpoint.clear()
+
+        # Calculate final statistics
+        self.stats.total_time = time.time() - start_time
+        self.stats.items_per_sec = self.throughput.rate
+
+        if self.dead_letters is not None and not self.is_shard_worker:
+            self.dead_letters.compact()
+
+        if self.config.show_stats:
+            self._print_stats()
+
+        return self.stats
+
+    async def sync_sharded(
+        self,
+        items: Iterable[T] | AsyncIterable[T],
+        get_cache_key: Callable[[T], str],
+        setup: Callable[[int, int], Dict[str, Any]],
+        shards: Optional[int] = None,
+        total: Optional[int] = None,
+        chunk_size: int = 64,
+    ) -> SyncStats:
+        """
+        Sync across several worker processes, each with its own event loop
+
+        Items are partitioned by a stable hash of their cache key, so a key is
+        always handled by the same shard. Each worker gets an equal slice of
+        the config's rate limiter and reports its stats back to this process,
+        which draws one combined progress bar and prints the merged stats.
+
+        Args:
+            items: Items to process, as for sync(). Items must be picklable.
+            get_cache_key: Function to extract cache key from item
+            setup: Top-level (picklable) function called in each worker as
+                setup(shard_index, shard_count). It returns the remaining sync()
+                keyword arguments: fetch_func, cache_controller, get_cache_key,
+                get_display_name and optionally should_skip and transform_result.
+            shards: Number of worker processes, defaults to the CPU count
+            total: Optional expected item count for progress
+            chunk_size: Items sent to a worker per message
+        """
+        shards = shards or os.cpu_count() or 1
+        start_time = time.time()
+        self.stats = SyncStats(
+            total=len(items) if hasattr(items, "__len__") else total or 0
+        )
+
+        self.console.print(
+            Panel(
+                f"Starting {self.config.name} sync for [bold cyan]{self.stats.total or 'streamed'}[/bold cyan] items\n"
+                f"Shards: [bold blue]{shards}[/bold blue] worker processes, "
+                f"batch size [bold blue]{self.config.batch_size}[/bold blue] "
+                f"([bold blue]{self.config.concurrency_mode}[/bold blue] mode) each",
+                title=f"🚀 {self.config.name} Sync Started",
+                border_style="green",
             )
-        else:
-            await self._sync_without_progress(
-                items,
-                fetch_func,
-                cache_controller,
-                get_cache_key,
-                get_display_name,
-                should_skip,
-                transform_result,
+        )
+
+        context = multiprocessing.get_context("spawn")
+        item_queues = [context.Queue(maxsize=8) for _ in range(shards)]
+        events = context.Queue()
+        stop_event = context.Event()
+        processes = [
+            context.Process(
+                target=_run_shard,
+                args=(
+                    i,
+                    shards,
+                    self.config,
+                    setup,
+                    item_queues[i],
+                    events,
+                    stop_event,
+                ),
+                daemon=True,
             )
+            for i in range(shards)
+        ]
+        for process in processes:
+            process.start()
 
-        # Calculate final statistics
+        shard_stats: Dict[int, Dict[str, Any]] = {}
+        finished = set()
+        failed_shards = set()
+
+        def merged_stats() -> SyncStats:
+            merged = SyncStats(total=self.stats.total)
+            for stats in shard_stats.values():
+                for f in fields(SyncStats):
+                    if f.name == "stage_latency":
+                        for stage, histogram in stats[f.name].items():
+                            merged.stage_latency[stage].merge(histogram)
+                    elif f.name not in ("total", "total_time"):
+                        setattr(merged, f.name, getattr(merged, f.name) + stats[f.name])
+            return merged
+
+        async def feed():
+            chunks: List[List[T]] = [[] for _ in range(shards)]
+
+            async def send(shard, chunk) -> bool:
+                """Queue a chunk for a shard, False once that worker is gone"""
+                while not self.shutdown_requested:
+                    if shard in finished or not processes[shard].is_alive():
+                        failed_shards.add(shard)
+                        return False
+                    try:
+                        await asyncio.to_thread(
+                            item_queues[shard].put, chunk, True, 0.2
+                        )
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+
+            count = 0
+            if hasattr(items, "__aiter__"):
+                iterator = aiter(items)
+                next_item = lambda: anext(iterator)
+            else:
+                iterator = iter(items)
+
+                async def next_item():
+                    try:
+                        return next(iterator)
+                    except StopIteration:
+                        raise StopAsyncIteration
+
+            while not self.shutdown_requested and not failed_shards:
+                try:
+                    item = await next_item()
+                except StopAsyncIteration:
+                    break
+                count += 1
+                shard = shard_for_key(get_cache_key(item), shards)
+                chunks[shard].append(item)
+                if len(chunks[shard]) >= chunk_size:
+                    await send(shard, chunks[shard])
+                    chunks[shard] = []
+
+            # Without a worker for some keys the run can't complete, only let
+            # the live shards finish what they already got
+            for shard, chunk in enumerate(chunks):
+                if chunk and not failed_shards:
+                    await send(shard, chunk)
+                if shard not in failed_shards:
+                    await send(shard, None)
+            if failed_shards:
+                self.console.print(
+                    f"[red]❌ Stopped feeding items, shard(s) "
+                    f"{', '.join(map(str, sorted(failed_shards)))} exited early[/red]"
+                )
+            elif not self.shutdown_requested:
+                self.stats.total = count
+
+        async def monitor(progress=None, task=None):
+            while len(finished) < shards:
+                if self.shutdown_requested:
+                    stop_event.set()
+                try:
+                    kind, shard, payload = await asyncio.to_thread(
+                        events.get, True, 0.2
+                    )
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+                    continue
+
+                if kind == "error":
+                    self.console.print(f"[red]❌ Shard {shard} failed: {payload}[/red]")
+                    continue
+                concurrency = payload.pop("concurrency", None)
+                if concurrency is not None:
+                    self.shard_concurrency[shard] = concurrency
+                shard_stats[shard] = payload
+                if kind == "done":
+                    finished.add(shard)
+
+                if progress:
+                    merged = merged_stats()
+                    progress.update(
+                        task,
+                        total=self.stats.total or None,
+                        completed=merged.processed + merged.skipped + merged.errors,
+                        description=f"[cyan]Processing items ({len(finished)}/{shards} shards done)...",
+                        counters=self._progress_counters(merged),
+                    )
+
+        try:
+            if self.config.show_progress:
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    MofNCompleteColumn(),
+                    BarColumn(),
+                    TaskProgressColumn(),
+                    TimeElapsedColumn(),
+                    TextColumn("[dim]{task.fields[counters]}"),
+                    console=self.console,
+                ) as progress:
+                    task = progress.add_task(
+                        f"[cyan]Processing items...",
+                        total=self.stats.total or None,
+                        counters=self._progress_counters(),
+                    )
+                    await asyncio.gather(feed(), monitor(progress, task))
+            else:
+                await asyncio.gather(feed(), monitor())
+        finally:
+            stop_event.set()
+            for process in processes:
+                await asyncio.to_thread(process.join, 5)
+                if process.is_alive():
+                    process.terminate()
+
+        if self.shutdown_requested:
+            self.console.print(
+                "\n[bold yellow]⚠️ Shutdown requested, stopping gracefully...[/bold yellow]"
+            )
+        elif self.checkpoint is not None and not failed_shards:
+            self.checkpoint.clear()
+
+        total_items = self.stats.total
+        self.stats = merged_stats()
+        self.stats.total = total_items
         self.stats.total_time = time.time() - start_time
 
+        if self.dead_letters is not None:
+            # Workers append to the shared file, pick up their entries
+            self.dead_letters.load()
+            self.dead_letters.compact()
+
         if self.config.show_stats:
             self._print_stats()
 
@@ -163,13 +591,16 @@ class DataSyncOrchestrator(Generic[T]):
             BarColumn(),
             TaskProgressColumn(),
             TimeElapsedColumn(),
+            TextColumn("[dim]{task.fields[counters]}"),
             console=self.console,
         ) as progress:
             task = progress.add_task(
-                f"[cyan]Processing items...", total=self.stats.total
+                f"[cyan]Processing items...",
+                total=self.stats.total or None,
+                counters=self._progress_counters(),
             )
 
-            await self._process_items_concurrent(
+            await self._run_items(
                 items,
                 fetch_func,
                 cache_controller,
@@ -192,7 +623,7 @@ class DataSyncOrchestrator(Generic[T]):
         transform_result,
     ):
         """Sync without progress bar"""
-        await self._process_items_concurrent(
+        await self._run_items(
             items,
             fetch_func,
             cache_controller,
@@ -202,6 +633,272 @@ class DataSyncOrchestrator(Generic[T]):
             transform_result,
         )
 
+    async def _run_items(
+        self,
+        items,
+        fetch_func,
+        cache_controller,
+        get_cache_key,
+        get_display_name,
+        should_skip,
+        transform_result,
+        progress=None,
+        task=None,
+    ):
+        """Stream items through a bounded prefetch buffer into the processor"""
+
+        def on_exhausted(count):
+            self.stats.total = count
+            if progress:
+                progress.update(task, total=count)
+
+        source = PrefetchedItems(items, self.config.prefetch_size, on_exhausted)
+        source.start()
+        if self.config.write_behind:
+            self.writer = WriteBehindWriter(
+                cache_controller,
+                batch_size=self.config.write_batch_size,
+                flush_interval=self.config.write_flush_interval,
+                max_pending=self.config.write_queue_size,
+                on_written=self._on_cache_written,
+                on_error=self._on_cache_write_error,
+            )
+            self.writer.start()
+        try:
+            await self._get_items_processor()(
+                source,
+                fetch_func,
+                cache_controller,
+                get_cache_key,
+                get_display_name,
+                should_skip,
+                transform_result,
+                progress,
+                task,
+            )
+        finally:
+            await source.close()
+            if self.writer is not None:
+                await self.writer.close()
+                self.writer = None
+            # Persist buffered cache metadata, e.g. after Ctrl+C
+            if hasattr(cache_controller, "flush"):
+                cache_controller.flush()
+
+    def _record_processed(self, cache_key: str, completion: "_Completion"):
+        """Count an item whose result reached the cache"""
+        self.stats.total_items_found += completion.item_count
+        self.stats.processed += 1
+        if completion.is_refresh:
+            self.stats.refreshed += 1
+
+        self._item_event(
+            "processed",
+            cache_key,
+            f"[green]✅ {completion.display_name}[/green] - Found "
+            f"[bold]{completion.item_count}[/bold] items"
+            + (" (refreshed)" if completion.is_refresh else ""),
+            items=completion.item_count,
+            attempts=completion.attempts,
+            refreshed=completion.is_refresh,
+        )
+
+        if self.dead_letters is not None:
+            self.dead_letters.resolve(cache_key)
+        if self.checkpoint is not None:
+            self.checkpoint.record(cache_key)
+
+    def _on_cache_written(self, keys: List[str], elapsed: float):
+        # Spread the batch write time over its items
+        for key in keys:
+            self.stats.record_latency("cache_write", elapsed / len(keys))
+            completion = self.pending_writes.pop(key, None)
+            if completion is not None:
+                self._record_processed(key, completion)
+
+    def _on_cache_write_error(self, key: str, error: Exception):
+        self.stats.errors += 1
+        completion = self.pending_writes.pop(key, None)
+        self._item_event(
+            "write_error",
+            key,
+            f"[red]❌ Error writing {key} to cache: {str(error)}[/red]",
+            error=str(error),
+        )
+        if self.dead_letters is not None and completion is not None:
+            self.dead_letters.add(key, completion.item, error, completion.attempts)
+            self.stats.dead_lettered += 1
+
+    def _item_event(self, event: str, key: str, message: str, **fields):
+        """Report a per-item event to the console and the event log"""
+        if not self.config.quiet or event in ("error", "write_error"):
+            self.console.print(message)
+        if self.event_log is not None:
+            self.event_log.log(event, key=key, **fields)
+
+    def _progress_counters(self, stats: Optional[SyncStats] = None) -> str:
+        stats = stats or self.stats
+        rate = stats.items_per_sec if stats is not self.stats else self.throughput.rate
+        if not self.config.quiet:
+            return f"{rate:.1f} items/s"
+        return (
+            f"✅ {stats.processed} ⏭️ {stats.skipped} ❌ {stats.errors} "
+            f"{rate:.1f} items/s"
+        )
+
+    def _advance_progress(self, progress, task, advance: int = 1):
+        progress.update(task, advance=advance, counters=self._progress_counters())
+
+    def _get_items_processor(self):
+        """Pick the item processing strategy for the configured concurrency mode"""
+        if self.config.concurrency_mode in ("window", "adaptive"):
+            return self._process_items_window
+        if self.config.concurrency_mode == "batch":
+            return self._process_items_concurrent
+        raise ValueError(f"Unknown concurrency mode: {self.config.concurrency_mode!r}")
+
+    async def _process_items_window(
+        self,
+        items,
+        fetch_func,
+        cache_controller,
+        get_cache_key,
+        get_display_name,
+        should_skip,
+        transform_result,
+        progress=None,
+        task=None,
+    ):
+        """
+        Process items with a sliding window of in-flight operations
+
+        The window is batch_size wide, or in adaptive mode max_batch_size workers
+        gated by the concurrency controller.
+        """
+        in_flight = 0
+
+        async def worker():
+            nonlocal in_flight
+            # All workers share one source, so each item is taken exactly once
+            async for item in items:
+                if self.shutdown_requested:
+                    break
+
+                in_flight += 1
+                if progress:
+                    progress.update(
+                        task,
+                        description=f"[cyan]Processing items ({self._describe_window(in_flight)})...",
+                    )
+                try:
+                    await self._process_single_item(
+                        item,
+                        fetch_func,
+                        cache_controller,
+                        get_cache_key,
+                        get_display_name,
+                        should_skip,
+                        transform_result,
+                    )
+                finally:
+                    in_flight -= 1
+
+                self.throughput.record()
+                if progress:
+                    self._advance_progress(progress, task)
+
+                # Rate limiting per worker slot
+                if self.config.batch_delay > 0:
+                    await asyncio.sleep(self.config.batch_delay)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(max(1, self._max_in_flight()))
+        ]
+        await asyncio.gather(*workers)
+
+        if self.shutdown_requested:
+            self.console.print(
+                "\n[bold yellow]⚠️ Shutdown requested, stopping gracefully...[/bold yellow]"
+            )
+
+    def _max_in_flight(self) -> int:
+        if self.concurrency_controller:
+            return self.concurrency_controller.max_limit
+        return self.config.batch_size
+
+    def _describe_window(self, in_flight: int) -> str:
+        if self.concurrency_controller:
+            return (
+                f"{self.concurrency_controller.in_flight}/"
+                f"{self.concurrency_controller.limit} fetches in flight"
+            )
+        return f"{in_flight} in flight"
+
+    async def _fetch(self, item, fetch_func, validators=None):
+        """Fetch one item, honouring the rate limiter and adaptive concurrency"""
+        if self.config.rate_limiter and self.config.rate_limit_key:
+            await self.config.rate_limiter.acquire(self.config.rate_limit_key)
+
+        if self.concurrency_controller:
+            await self.concurrency_controller.acquire()
+        start = time.perf_counter()
+        try:
+            if self.config.conditional_fetch:
+                result = await fetch_func(item, validators or {})
+            else:
+                result = await fetch_func(item)
+        except Exception as e:
+            if self.concurrency_controller:
+                await self.concurrency_controller.release(None, is_congestion_error(e))
+            raise
+        latency = time.perf_counter() - start
+        self.stats.record_latency("fetch", latency)
+        if self.concurrency_controller:
+            await self.concurrency_controller.release(latency)
+        return result
+
+    async def _is_cached(self, cache_controller, cache_key: str) -> bool:
+        # contains() answers from an in-memory index instead of loading the value
+        if hasattr(cache_controller, "contains"):
+            return cache_controller.contains(cache_key)
+        # Keep the event loop free while reading from disk
+        if hasattr(cache_controller, "aget"):
+            return await cache_controller.aget(cache_key) is not None
+        return cache_controller.get(cache_key) is not None
+
+    async def _cache_set(self, cache_controller, cache_key: str, value):
+        if hasattr(cache_controller, "aset"):
+            await cache_controller.aset(cache_key, value)
+        else:
+            cache_controller.set(cache_key, value)
+
+    async def _cache_touch(self, cache_controller, cache_key: str, meta: dict):
+        if hasattr(cache_controller, "atouch"):
+            await cache_controller.atouch(cache_key, **meta)
+        else:
+            cache_controller.touch(cache_key, **meta)
+
+    def _cache_meta(self, cache_controller, cache_key: str) -> dict:
+        """Stored metadata of `cache_key` without the sync timestamps"""
+        if not hasattr(cache_controller, "get_meta"):
+            return {}
+        meta = cache_controller.get_meta(cache_key) or {}
+        return {k: v for k, v in meta.items() if k not in _SYNC_META_FIELDS}
+
+    def _is_stale(self, cache_controller, cache_key: str) -> bool:
+        if not self.config.refresh_stale or not hasattr(cache_controller, "is_stale"):
+            return False
+        # Values still queued for write-behind were just fetched
+        if self.writer is not None and cache_key in self.writer:
+            return False
+        return cache_controller.is_stale(cache_key, self.config.refresh_ttl)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt > self.config.max_retries or self.shutdown_requested:
+            return False
+        is_retryable = self.config.is_retryable or is_retryable_error
+        return is_retryable(error)
+
     async def _process_items_concurrent(
         self,
         items,
@@ -216,14 +913,23 @@ class DataSyncOrchestrator(Generic[T]):
     ):
         """Process items concurrently in batches"""
         # Process items in batches
-        for i in range(0, len(items), self.config.batch_size):
+        is_first_batch = True
+        while True:
             if self.shutdown_requested:
                 self.console.print(
                     "\n[bold yellow]⚠️ Shutdown requested, stopping gracefully...[/bold yellow]"
                 )
                 break
 
-            batch = items[i : i + self.config.batch_size]
+            batch = await items.take(self.config.batch_size)
+            if not batch:
+                break
+
+            # Rate limiting between batches
+            if not is_first_batch and self.config.batch_delay > 0:
+                await asyncio.sleep(self.config.batch_delay)
+            is_first_batch = False
+
             self.stats.concurrent_batches += 1
 
             if progress:
@@ -250,12 +956,9 @@ class DataSyncOrchestrator(Generic[T]):
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             # Update progress for the entire batch
+            self.throughput.record(len(batch))
             if progress:
-                progress.advance(task, len(batch))
-
-            # Rate limiting between batches
-            if self.config.batch_delay > 0 and i + self.config.batch_size < len(items):
-                await asyncio.sleep(self.config.batch_delay)
+                self._advance_progress(progress, task, len(batch))
 
     async def _process_single_item(
         self,
@@ -271,31 +974,144 @@ class DataSyncOrchestrator(Generic[T]):
         cache_key = get_cache_key(item)
         display_name = get_display_name(item)
 
-        # Check cache
-        if cache_controller.get(cache_key) is not None:
-            self.console.print(
-                f"[dim]⏭️ Skipping {display_name} (already cached)[/dim]"
+        # Check checkpoint journal from previous runs, unless the cache lost the
+        # entry since (e.g. it was deleted to force a cold re-sync)
+        if (
+            self.checkpoint is not None
+            and cache_key in self.checkpoint
+            and (
+                not hasattr(cache_controller, "contains")
+                or cache_controller.contains(cache_key)
+            )
+        ):
+            self._item_event(
+                "skip",
+                cache_key,
+                f"[dim]⏭️ Skipping {display_name} (completed in previous run)[/dim]",
+                reason="checkpoint",
+            )
+            self.stats.skipped += 1
+            self.stats.resumed += 1
+            return
+
+        # Check cache, including writes still queued in the write-behind stage
+        start = time.perf_counter()
+        is_cached = (
+            self.writer is not None and cache_key in self.writer
+        ) or await self._is_cached(cache_controller, cache_key)
+        is_refresh = is_cached and self._is_stale(cache_controller, cache_key)
+        self.stats.record_latency("cache_check", time.perf_counter() - start)
+        if is_cached and not is_refresh:
+            self._item_event(
+                "skip",
+                cache_key,
+                f"[dim]⏭️ Skipping {display_name} (already cached)[/dim]",
+                reason="cached",
+            )
+            self.stats.skipped += 1
+            if self.dead_letters is not None:
+                self.dead_letters.resolve(cache_key)
+            if self.checkpoint is not None:
+                self.checkpoint.record(cache_key)
+            return
+
+        if (
+            self.config.fetch_budget is not None
+            and self.fetches_started >= self.config.fetch_budget
+        ):
+            self._item_event(
+                "skip",
+                cache_key,
+                f"[dim]⏭️ Deferring {display_name} (fetch budget spent)[/dim]",
+                reason="budget",
             )
             self.stats.skipped += 1
+            self.stats.deferred += 1
             return
+        self.fetches_started += 1
+
+        # Validators and content hash stored with the cached copy
+        cached_meta = {}
+        if is_refresh and (self.config.conditional_fetch or self.config.skip_unchanged):
+            cached_meta = self._cache_meta(cache_controller, cache_key)
 
+        attempt = 0
         try:
-            result = await fetch_func(item)
+            # Retry retryable errors with exponential backoff and jitter
+            while True:
+                attempt += 1
+                try:
+                    result = await self._fetch(item, fetch_func, cached_meta)
+                    break
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    delay = backoff_delay(
+                        attempt,
+                        self.config.retry_base_delay,
+                        self.config.retry_max_delay,
+                    )
+                    self.stats.retries += 1
+                    self._item_event(
+                        "retry",
+                        cache_key,
+                        f"[yellow]🔁 Retrying {display_name} in {delay:.1f}s "
+                        f"(attempt {attempt}/{self.config.max_retries}): {str(e)}[/yellow]",
+                        attempt=attempt,
+                        delay=delay,
+                        error=str(e),
+                    )
+                    await asyncio.sleep(delay)
+
+            not_modified = False
+            meta = {}
+            if isinstance(result, FetchResult):
+                not_modified = result.not_modified
+                meta = dict(result.validators)
+                result = result.data
+            if self.config.skip_unchanged and not not_modified:
+                meta["content_hash"] = hashlib.sha256(
+                    json.dumps(result, sort_keys=True, default=str).encode()
+                ).hexdigest()
+                not_modified = (
+                    is_refresh
+                    and cached_meta.get("content_hash") == meta["content_hash"]
+                )
+
+            # Unchanged since the cached copy, only mark it as synced
+            if not_modified and is_refresh:
+                await self._cache_touch(cache_controller, cache_key, meta)
+                self.stats.processed += 1
+                self.stats.refreshed += 1
+                self.stats.unchanged += 1
+                self._item_event(
+                    "unchanged",
+                    cache_key,
+                    f"[dim]♻️ {display_name} unchanged since last sync[/dim]",
+                    attempts=attempt,
+                )
+                if self.dead_letters is not None:
+                    self.dead_letters.resolve(cache_key)
+                if self.checkpoint is not None:
+                    self.checkpoint.record(cache_key)
+                return
 
             # Custom skip logic
             if should_skip and should_skip(item, result):
-                self.console.print(
-                    f"[dim]⏭️ Skipping {display_name} (custom skip logic)[/dim]"
+                self._item_event(
+                    "skip",
+                    cache_key,
+                    f"[dim]⏭️ Skipping {display_name} (custom skip logic)[/dim]",
+                    reason="custom",
                 )
                 self.stats.skipped += 1
                 return
 
             # Transform result if needed
             if transform_result:
+                start = time.perf_counter()
                 result = transform_result(result)
-
-            # Cache the result
-            cache_controller.set(cache_key, result)
+                self.stats.record_latency("transform", time.perf_counter() - start)
 
             # Update stats
             item_count = (
@@ -305,19 +1121,37 @@ class DataSyncOrchestrator(Generic[T]):
                 if hasattr(result, "__len__")
                 else 1
             )
-            self.stats.total_items_found += item_count
-            self.stats.processed += 1
-
-            self.console.print(
-                f"[green]✅ {display_name}[/green] - Found [bold]{item_count}[/bold] items"
+            completion = _Completion(
+                item, display_name, item_count, attempt, is_refresh
             )
 
+            # Cache the result, with write-behind the item counts as processed
+            # once its batch reaches the cache
+            if self.writer is not None:
+                self.pending_writes[cache_key] = completion
+                await self.writer.put(cache_key, result, meta)
+            else:
+                start = time.perf_counter()
+                await self._cache_set(cache_controller, cache_key, result)
+                if meta:
+                    await self._cache_touch(cache_controller, cache_key, meta)
+                self.stats.record_latency("cache_write", time.perf_counter() - start)
+                self._record_processed(cache_key, completion)
+
         except Exception as e:
-            self.console.print(
-                f"[red]❌ Error processing {display_name}: {str(e)}[/red]"
+            self._item_event(
+                "error",
+                cache_key,
+                f"[red]❌ Error processing {display_name}: {str(e)}[/red]",
+                error=str(e),
+                attempts=attempt,
             )
             self.stats.errors += 1
 
+            if self.dead_letters is not None:
+                self.dead_letters.add(cache_key, item, e, attempt)
+                self.stats.dead_lettered += 1
+
     async def _process_items(
         self,
         items,
@@ -345,7 +1179,7 @@ class DataSyncOrchestrator(Generic[T]):
                 progress.update(task, description=f"[cyan]Processing {display_name}...")
 
             # Check cache
-            if cache_controller.get(cache_key) is not None:
+            if await self._is_cached(cache_controller, cache_key):
                 self.console.print(
                     f"[dim]⏭️  Skipping {display_name} (already cached)[/dim]"
                 )
@@ -396,6 +1230,25 @@ class DataSyncOrchestrator(Generic[T]):
             if progress:
                 progress.advance(task)
 
+    def _concurrency_summary(self) -> Optional[Dict[str, Any]]:
+        """Adaptive concurrency state, summed over the workers after sync_sharded"""
+        if not self.shard_concurrency:
+            if self.concurrency_controller is None:
+                return None
+            return self.concurrency_controller.to_dict()
+        shards = self.shard_concurrency.values()
+        summary = {
+            name: sum(shard[name] for shard in shards)
+            for name in ("limit", "peak_limit", "increases", "decreases")
+        }
+        latencies = [
+            shard["latency_ewma"]
+            for shard in shards
+            if shard["latency_ewma"] is not None
+        ]
+        summary["latency_ewma"] = sum(latencies) / len(latencies) if latencies else None
+        return summary
+
     def _print_stats(self):
         """Print final statistics"""
         table = Table(
@@ -410,6 +1263,28 @@ class DataSyncOrchestrator(Generic[T]):
         table.add_row("Total Items", str(self.stats.total), "Items processed")
         table.add_row("Processed", str(self.stats.processed), "New API calls made")
         table.add_row("Skipped (Cached)", str(self.stats.skipped), "Already in cache")
+        if self.checkpoint is not None:
+            table.add_row(
+                "Resumed",
+                str(self.stats.resumed),
+                "Skipped via checkpoint journal",
+            )
+        if self.config.refresh_stale:
+            table.add_row(
+                "Refreshed", str(self.stats.refreshed), "Stale cache entries re-fetched"
+            )
+        if self.config.conditional_fetch or self.config.skip_unchanged:
+            table.add_row(
+                "Unchanged",
+                str(self.stats.unchanged),
+                "Refreshed without rewriting the cache",
+            )
+        if self.config.fetch_budget is not None:
+            table.add_row(
+                "Deferred",
+                str(self.stats.deferred),
+                f"Skipped after the fetch budget of {self.config.fetch_budget} was spent",
+            )
         table.add_row(
             "Total Items Found", str(self.stats.total_items_found), "Across all items"
         )
@@ -418,20 +1293,86 @@ class DataSyncOrchestrator(Generic[T]):
             f"{self.stats.avg_items:.1f}",
             "Items per processed item",
         )
+        table.add_row(
+            "Concurrency Mode",
+            self.config.concurrency_mode,
+            f"Up to {self._max_in_flight()} operations in flight",
+        )
+        concurrency = self._concurrency_summary()
+        if concurrency:
+            scope = (
+                f" across {len(self.shard_concurrency)} shards"
+                if self.shard_concurrency
+                else ""
+            )
+            table.add_row(
+                "Concurrency Level",
+                str(concurrency["limit"]),
+                f"Peak {concurrency['peak_limit']}, "
+                f"{concurrency['increases']} increases, "
+                f"{concurrency['decreases']} decreases{scope}",
+            )
+            table.add_row(
+                "Latency EWMA",
+                (
+                    f"{concurrency['latency_ewma']:.2f}s"
+                    if concurrency["latency_ewma"] is not None
+                    else "-"
+                ),
+                f"Smoothed fetch latency{' (mean of shards)' if scope else ''}",
+            )
         table.add_row(
             "Concurrent Batches",
             str(self.stats.concurrent_batches),
             "Batches processed",
         )
+        table.add_row("Errors", str(self.stats.errors), "Items that failed")
+        table.add_row("Retries", str(self.stats.retries), "Retried fetch attempts")
+        if self.dead_letters is not None:
+            table.add_row(
+                "Dead Letters",
+                str(len(self.dead_letters)),
+                f"{self.stats.dead_lettered} added this run",
+            )
         table.add_row(
             "Total Time", f"{self.stats.total_time:.2f}s", "Total execution time"
         )
         table.add_row(
-            "Average Time/Item", f"{self.stats.avg_time:.2f}s", "Time per item"
+            "Average Time/Item",
+            f"{self.stats.avg_time:.2f}s",
+            "Wall time per item, skips included",
+        )
+        table.add_row(
+            "Throughput",
+            f"{self.stats.to_dict()['overall_items_per_sec']:.1f}/s",
+            f"Last {self.throughput.window:.0f}s: {self.stats.items_per_sec:.1f} items/s",
         )
 
         self.console.print(table)
 
+        latency_table = Table(
+            title="⏱️  Stage Latency",
+            show_header=True,
+            header_style="bold magenta",
+        )
+        latency_table.add_column("Stage", style="cyan", no_wrap=True)
+        for column in ("Count", "Mean", "p50", "p95", "p99", "Max"):
+            latency_table.add_column(column, style="green", justify="right")
+        for stage, histogram in self.stats.stage_latency.items():
+            if histogram.count == 0:
+                continue
+            summary = histogram.to_dict()
+            latency_table.add_row(
+                stage,
+                str(summary["count"]),
+                *(
+                    f"{summary[key] * 1000:.1f}ms"
+                    for key in ("mean", "p50", "p95", "p99", "max")
+                ),
+            )
+        if latency_table.row_count:
+            self.console.print(latency_table)
+
         if self.config.cache_location:
             cache_info = Panel(
                 f"Cache Location: [cyan]{self.config.cache_location}[/cyan]\n"
@@ -464,3 +1405,74 @@ class DataSyncOrchestrator(Generic[T]):
                     border_style="yellow",
                 )
             )
+
+
+def _run_shard(shard, shards, config, setup, item_queue, events, stop_event):
+    """Entry point of a sync_sharded worker process"""
+    # The parent handles Ctrl+C and tells workers to stop via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(
+            _sync_shard(shard, shards, config, setup, item_queue, events, stop_event)
+        )
+    except Exception as e:
+        events.put(("error", shard, f"{type(e).__name__}: {e}"))
+        events.put(("done", shard, asdict(SyncStats())))
+
+
+async def _sync_shard(shard, shards, config, setup, item_queue, events, stop_event):
+    config = replace(
+        config,
+        show_progress=False,
+        show_stats=False,
+        rate_limiter=(
+            config.rate_limiter.scaled(1 / shards) if config.rate_limiter else None
+        ),
+        fetch_budget=(
+            math.ceil(config.fetch_budget / shards)
+            if config.fetch_budget is not None
+            else None
+        ),
+        # One event log per worker so lines from different processes never interleave
+        event_log_file=(
+            f"{config.event_log_file}.shard{shard}" if config.event_log_file else None
+        ),
+    )
+    orchestrator = DataSyncOrchestrator(config)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    orchestrator.console = Console(quiet=True)
+    orchestrator.is_shard_worker = True
+
+    async def shard_items():
+        while not orchestrator.shutdown_requested:
+            try:
+                chunk = await asyncio.to_thread(item_queue.get, True, 0.2)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                return
+            for item in chunk:
+                yield item
+
+    def payload(stats):
+        # The parent merges stats and sums the adaptive concurrency state
+        controller = orchestrator.concurrency_controller
+        return {
+            **asdict(stats),
+            "concurrency": controller.to_dict() if controller else None,
+        }
+
+    async def report():
+        while True:
+            await asyncio.sleep(0.25)
+            if stop_event.is_set():
+                orchestrator.shutdown_requested = True
+            orchestrator.stats.items_per_sec = orchestrator.throughput.rate
+            events.put(("progress", shard, payload(orchestrator.stats)))
+
+    reporter = asyncio.create_task(report())
+    try:
+        stats = await orchestrator.sync(shard_items(), **setup(shard, shards))
+    finally:
+        reporter.cancel()
+    events.put(("done", shard, payload(stats)))
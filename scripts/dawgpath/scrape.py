@@ -3,10 +3,15 @@ import httpx
 from lxml import html
 from rich import print
 from scripts.db import with_db, CEC_DATA_TABLE
+from scripts.http_transport import get_transport
+from scripts.rate_limiter import DEFAULT_HOST_LIMITS, RateLimiter, throttle
 import json
 
 LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# Shared by every request so a replay keeps one seeded RNG and one set of counters
+transport = get_transport()
+
 cookies = {
     "_ga_VQZHV3SH3P": "GS2.1.s1746589140$o1$g1$t1746589227$j0$l0$h0",
     "_gcl_au": "1.1.437147894.1747197726",
@@ -36,9 +41,12 @@ cookies = {
 }
 
 
-async def get_course_dawgpath_detail(code: str):
+async def get_course_dawgpath_detail(
+    code: str, rate_limiter: RateLimiter | None = None
+):
     full_url = f"https://dawgpath.uw.edu/api/v1/courses/details/{code}"
-    async with httpx.AsyncClient() as client:
+    await throttle(rate_limiter, full_url)
+    async with httpx.AsyncClient(transport=transport) as client:
         response = await client.get(
             full_url,
             cookies=cookies,
@@ -48,9 +56,12 @@ async def get_course_dawgpath_detail(code: str):
     return data
 
 
-async def get_subject_dawgpath_detail(subject: str):
+async def get_subject_dawgpath_detail(
+    subject: str, rate_limiter: RateLimiter | None = None
+):
     full_url = f"https://dawgpath.uw.edu/api/v1/curric_prereq/{subject}"
-    async with httpx.AsyncClient() as client:
+    await throttle(rate_limiter, full_url)
+    async with httpx.AsyncClient(transport=transport) as client:
         response = await client.get(
             full_url,
             cookies=cookies,
@@ -61,9 +72,10 @@ async def get_subject_dawgpath_detail(subject: str):
     return data
 
 
-async def get_all_subjects():
+async def get_all_subjects(rate_limiter: RateLimiter | None = None):
     full_url = "https://dawgpath.uw.edu/api/v1/search/?search_string=*&type[]=major&prev_type[]=major"
-    async with httpx.AsyncClient() as client:
+    await throttle(rate_limiter, full_url)
+    async with httpx.AsyncClient(transport=transport) as client:
         response = await client.get(
             full_url,
             cookies=cookies,
@@ -160,7 +172,8 @@ def upload_cec_course_data(conn, cursor, data: list[dict]):
 
 
 async def main():
-    courses = await get_all_letter_courses()
+    rate_limiter = RateLimiter(DEFAULT_HOST_LIMITS)
+    courses = await get_all_letter_courses(rate_limiter)
     print(f"Found {len(courses)} courses in total")
 
     total_processed = 0
@@ -170,7 +183,9 @@ async def main():
             batch = courses[i : i + batch_size]
             tasks = []
             for course in batch:
-                tasks.append(tg.create_task(get_course_cec_detail(course)))
+                tasks.append(
+                    tg.create_task(get_course_cec_detail(course, rate_limiter))
+                )
 
             task_data = []
             for task, course in zip(tasks, batch):
@@ -194,14 +209,15 @@ async def main():
     print(f"Total processed: {total_processed} courses")
 
 
-async def get_all_letter_courses():
+async def get_all_letter_courses(rate_limiter: RateLimiter | None = None):
+    rate_limiter = rate_limiter or RateLimiter(DEFAULT_HOST_LIMITS)
     results = []
     async with asyncio.TaskGroup() as tg:
         tasks = []
         for i in range(0, len(LETTERS), 10):
             batch = LETTERS[i : i + 10]
             for letter in batch:
-                tasks.append(tg.create_task(get_letter_courses(letter)))
+                tasks.append(tg.create_task(get_letter_courses(letter, rate_limiter)))
 
         for task in tasks:
             courses = await task
@@ -212,13 +228,14 @@ async def get_all_letter_courses():
 
 
 async def test_scrape():
+    rate_limiter = RateLimiter(DEFAULT_HOST_LIMITS)
     results = []
     async with asyncio.TaskGroup() as tg:
         tasks = []
         for i in range(0, len(LETTERS), 10):
             batch = LETTERS[i : i + 10]
             for letter in batch:
-                tasks.append(tg.create_task(get_letter_courses(letter)))
+                tasks.append(tg.create_task(get_letter_courses(letter, rate_limiter)))
 
         for task in tasks:
             courses = await task
@@ -18,6 +18,10 @@ def with_db(func):
     return wrapper
 
 
+async def connect_async() -> psycopg.AsyncConnection:
+    return await psycopg.AsyncConnection.connect(os.getenv("DATABASE_URL"))
+
+
 @with_db
 def run_query(conn, cursor, query):
     cursor.execute(query)
@@ -1,5 +1,5 @@
 import json
-from scripts.db import run_query
+from scripts.db import run_query, connect_async
 
 COURSES_TABLE = "uw_courses"
 MYPLAN_SUBJECT_AREAS_TABLE = "myplan_subject_areas"
@@ -74,6 +74,34 @@ def get_myplan_courses():
     ]
 
 
+async def stream_myplan_courses(itersize: int = 500):
+    """
+    Stream myplan courses through a server-side cursor, without the large
+    data/detail JSONB columns, so callers can start work on the first row
+    """
+    async with await connect_async() as conn:
+        async with conn.cursor(name="stream_myplan_courses") as cursor:
+            cursor.itersize = itersize
+            await cursor.execute(
+                f"""
+            SELECT c.id, c.code, c.quarter, c."subjectAreaCode"
+            FROM {MYPLAN_COURSES_TABLE} c
+            """
+            )
+            async for row in cursor:
+                yield {
+                    "id": row[0],
+                    "code": row[1],
+                    "quarter": row[2],
+                    "subjectAreaCode": row[3],
+                }
+
+
+def count_myplan_courses() -> int:
+    data = run_query(f"SELECT count(*) FROM {MYPLAN_COURSES_TABLE}")
+    return data[0][0]
+
+
 def get_myplan_courses_short():
     data = run_query(
         f"""
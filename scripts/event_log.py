@@ -0,0 +1,55 @@
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+_STOP = object()
+
+
+class JsonlEventLog:
+    """
+    JSON-lines event log written from a background thread.
+
+    `log()` only enqueues the event, so callers on the event loop never wait
+    for JSON encoding or disk I/O. Each line has a `ts` (unix time) and an
+    `event` name plus any extra fields.
+    """
+
+    file: Path
+
+    def __init__(self, file: str | Path, flush_interval: float = 1.0):
+        if isinstance(file, str):
+            file = Path(file)
+        self.file = file
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, event: str, **fields):
+        self._queue.put({"ts": time.time(), "event": event, **fields})
+
+    def _run(self):
+        last_flush = time.monotonic()
+        with open(self.file, "a") as f:
+            while True:
+                try:
+                    entry = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    entry = None
+                if entry is _STOP:
+                    break
+                if entry is not None:
+                    f.write(json.dumps(entry, default=str) + "\n")
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    f.flush()
+                    last_flush = time.monotonic()
+
+    def close(self):
+        """Write out everything logged so far and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+
+import httpx
+
+# Per-request fields that change on every call and must not affect replay lookups
+VOLATILE_BODY_FIELDS = ("requestId",)
+
+# Encoding is undone when recording, the stored body is always decoded
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def request_key(request: httpx.Request) -> str:
+    """Stable corpus key from the method, URL and body, ignoring volatile fields"""
+    body = request.content
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            pass
+        else:
+            if isinstance(payload, dict):
+                for field in VOLATILE_BODY_FIELDS:
+                    payload.pop(field, None)
+            body = json.dumps(payload, sort_keys=True).encode()
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(str(request.url).encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class ResponseCorpus:
+    """
+    On-disk corpus of recorded responses, one gzipped JSON file per request
+    under `<corpus_dir>/<ab>/<key>.json.gz`.
+    """
+
+    corpus_dir: Path
+
+    def __init__(self, corpus_dir: str | Path):
+        if isinstance(corpus_dir, str):
+            corpus_dir = Path(corpus_dir)
+        self.corpus_dir = corpus_dir
+
+    def _path(self, key: str) -> Path:
+        return self.corpus_dir / key[:2] / f"{key}.json.gz"
+
+    def save(self, request: httpx.Request, response: httpx.Response):
+        key = request_key(request)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "method": request.method,
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": [
+                [name, value]
+                for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            ],
+            "content": base64.b64encode(response.content).decode(),
+        }
+        tmp_file = path.with_name(f".{path.name}.{os.getpid()}")
+        with gzip.open(tmp_file, "wt") as f:
+            json.dump(entry, f)
+        os.replace(tmp_file, path)
+
+    def load(self, request: httpx.Request) -> httpx.Response | None:
+        path = self._path(request_key(request))
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt") as f:
+            entry = json.load(f)
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=base64.b64decode(entry["content"]),
+            request=request,
+        )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Sends requests over the network and records every response in a corpus"""
+
+    def __init__(
+        self,
+        corpus: ResponseCorpus,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.corpus = corpus
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        # Decodes gzip/br, so the corpus holds plain bodies
+        content = await response.aread()
+        await response.aclose()
+        recorded = httpx.Response(
+            response.status_code,
+            headers=[
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            ],
+            content=content,
+            request=request,
+        )
+        await asyncio.to_thread(self.corpus.save, request, recorded)
+        return recorded
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded responses without touching the network.
+
+    Each request waits `latency` seconds plus up to `jitter` more. With
+    probability `error_rate` it fails with `error_status` (e.g. 429 or 503),
+    and with probability `timeout_rate` it raises httpx.ReadTimeout, which
+    exercises retries and adaptive concurrency. Unrecorded requests get a 404
+    and are counted in `misses`. Pass `seed` for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        corpus: ResponseCorpus,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        timeout_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.misses = 0
+        self.injected_errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self.random.random()
+        if roll < self.timeout_rate:
+            self.injected_errors += 1
+            raise httpx.ReadTimeout("Injected replay timeout", request=request)
+        if roll < self.timeout_rate + self.error_rate:
+            self.injected_errors += 1
+            return httpx.Response(self.error_status, request=request)
+
+        response = await asyncio.to_thread(self.corpus.load, request)
+        if response is None:
+            self.misses += 1
+            return httpx.Response(
+                404, content=b"Not recorded in replay corpus", request=request
+            )
+        return response
+
+
+def get_transport(**http_transport_options) -> httpx.AsyncBaseTransport | None:
+    """
+    Transport selected by the HTTP_TRANSPORT_MODE environment variable:
+    "live" (default, returns None so httpx uses the network), "record" or
+    "replay". HTTP_CORPUS_DIR sets the corpus location, and the replay knobs
+    are HTTP_REPLAY_LATENCY, HTTP_REPLAY_JITTER, HTTP_REPLAY_ERROR_RATE,
+    HTTP_REPLAY_ERROR_STATUS, HTTP_REPLAY_TIMEOUT_RATE and HTTP_REPLAY_SEED.
+    `http_transport_options` (limits, http2, ...) configure the network
+    transport used while recording.
+    """
+    mode = os.getenv("HTTP_TRANSPORT_MODE", "live")
+    if mode == "live":
+        return None
+    corpus = ResponseCorpus(os.getenv("HTTP_CORPUS_DIR", "temp/http_corpus"))
+    if mode == "record":
+        return RecordingTransport(
+            corpus, httpx.AsyncHTTPTransport(**http_transport_options)
+        )
+    if mode == "replay":
+        seed = os.getenv("HTTP_REPLAY_SEED")
+        return ReplayTransport(
+            corpus,
+            latency=float(os.getenv("HTTP_REPLAY_LATENCY", "0")),
+            jitter=float(os.getenv("HTTP_REPLAY_JITTER", "0")),
+            error_rate=float(os.getenv("HTTP_REPLAY_ERROR_RATE", "0")),
+            error_status=int(os.getenv("HTTP_REPLAY_ERROR_STATUS", "503")),
+            timeout_rate=float(os.getenv("HTTP_REPLAY_TIMEOUT_RATE", "0")),
+            seed=int(seed) if seed is not None else None,
+        )
+    raise ValueError(f"Unknown HTTP_TRANSPORT_MODE: {mode}")
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, AsyncIterable, Callable, Iterable, Optional
+
+_END = object()
+
+
+class PrefetchedItems:
+    """
+    Bounded prefetch buffer between an item source and the sync workers.
+
+    The source can be a list, any iterable/generator, or an async iterable
+    such as a streaming database cursor. A producer task reads ahead at most
+    `prefetch_size` items and blocks when workers fall behind, so memory stays
+    flat regardless of how many items the source yields. Several workers may
+    iterate the same instance concurrently; each item is handed out once.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any] | AsyncIterable[Any],
+        prefetch_size: int = 100,
+        on_exhausted: Optional[Callable[[int], None]] = None,
+    ):
+        self.items = items
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch_size))
+        self.on_exhausted = on_exhausted
+        self.produced = 0
+        self.exhausted = False
+        self.error: Optional[BaseException] = None
+        self._producer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._producer = asyncio.create_task(self._produce())
+
+    async def _produce(self):
+        try:
+            if hasattr(self.items, "__aiter__"):
+                async for item in self.items:
+                    await self.queue.put(item)
+                    self.produced += 1
+            else:
+                for item in self.items:
+                    await self.queue.put(item)
+                    self.produced += 1
+        except Exception as e:
+            self.error = e
+        self.exhausted = True
+        if self.on_exhausted:
+            self.on_exhausted(self.produced)
+        await self.queue.put(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.queue.get()
+        if item is _END:
+            # Leave the marker for the other workers
+            self.queue.put_nowait(_END)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        return item
+
+    async def take(self, n: int) -> list[Any]:
+        """Take up to `n` items, returning an empty list once the source is done"""
+        batch = []
+        async for item in self:
+            batch.append(item)
+            if len(batch) >= n:
+                break
+        return batch
+
+    async def close(self):
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,105 @@
+import math
+import time
+from collections import deque
+from typing import Optional
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with log-scaled buckets.
+
+    Each bucket spans `precision` (1% by default) of its lower bound, so
+    percentiles are accurate to that relative error with a bounded number of
+    buckets regardless of how many samples are recorded. Values are seconds.
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 1e-6):
+        self.precision = precision
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, value: float) -> int:
+        return int(
+            math.log(max(value, self.min_value) / self.min_value) / self._log_base
+        )
+
+    def _bucket_value(self, bucket: int) -> float:
+        # Upper bound of the bucket, so percentiles never under-report
+        return self.min_value * math.exp((bucket + 1) * self._log_base)
+
+    def record(self, value: float):
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(p / 100 * self.count)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min or 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max or 0.0,
+        }
+
+
+class RollingRate:
+    """Events per second over the last `window` seconds"""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self._events: deque[tuple[float, int]] = deque()
+        self._count = 0
+
+    def record(self, count: int = 1):
+        now = time.monotonic()
+        self._events.append((now, count))
+        self._count += count
+        self._expire(now)
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] > self.window:
+            self._count -= self._events.popleft()[1]
+
+    @property
+    def rate(self) -> float:
+        now = time.monotonic()
+        self._expire(now)
+        if not self._events:
+            return 0.0
+        elapsed = max(now - self._events[0][0], 1e-9)
+        return self._count / max(elapsed, min(self.window, 1.0))
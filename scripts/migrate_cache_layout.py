@@ -0,0 +1,27 @@
+# migrate_cache_layout.py
+import argparse
+import time
+from scripts.cache import DistributedCacheController
+
+
+def main(cache_dir: str, layout: str):
+    start = time.perf_counter()
+    cache_controller = DistributedCacheController(cache_dir)
+    previous_layout = cache_controller.layout
+    moved = cache_controller.migrate_layout(layout)
+    print(
+        f"Moved {moved} files in {cache_dir} from the {previous_layout} to the "
+        f"{layout} layout in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a DistributedCacheController directory between layouts"
+    )
+    parser.add_argument(
+        "cache_dir", help="e.g. temp/sync_myplan_courses/myplan_course_details"
+    )
+    parser.add_argument("layout", choices=["flat", "hashed"])
+    args = parser.parse_args()
+    main(args.cache_dir, args.layout)
@@ -0,0 +1,29 @@
+# migrate_cache_to_sqlite.py
+import argparse
+import time
+from scripts.cache import SqliteCacheController
+
+
+def main(cache_dir: str, cache_file: str):
+    start = time.perf_counter()
+    cache_controller = SqliteCacheController(cache_file)
+    count = cache_controller.import_directory(cache_dir)
+    cache_controller.close()
+    print(
+        f"Imported {count} entries from {cache_dir} into {cache_file} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Migrate a DistributedCacheController directory to SQLite"
+    )
+    parser.add_argument(
+        "cache_dir", help="e.g. temp/sync_myplan_courses/myplan_course_details"
+    )
+    parser.add_argument(
+        "cache_file", help="e.g. temp/sync_myplan_courses/myplan_course_details.db"
+    )
+    args = parser.parse_args()
+    main(args.cache_dir, args.cache_file)
@@ -1,41 +1,83 @@
 from dataclasses import dataclass
 import hashlib
+import json
 import time
 import httpx
 import uuid
 import os
 
+from scripts.adaptive_concurrency import is_congestion_error
+from scripts.http_transport import get_transport
+from scripts.rate_limiter import RateLimiter, throttle
+
+
+def _field(name: str) -> property:
+    return property(lambda self: self._data[name])
+
 
-@dataclass
 class Course:
-    id: str
-    courseId: str
-    code: str
-    subject: str
-    level: str
-    title: str
-    credit: str
-    campus: str
-    termId: str
-    institution: str
-    allCredits: list[str]
-    genEduReqs: list[any]
-    sectionGroups: list[str]
-    startTime: int
-    endTime: int
-    score: int
-    latestVersion: bool
-    expiringTermId: any
-    beginningTermId: any
-    prereqs: str
-    onlineLearningCodes: list[str]
-    meetingDays: list[str]
-    versions: list[any]
-    gradingSystems: list[str]
-    open: bool
-    tba: bool
-    pce: bool
-    enrRestricted: bool
+    """
+    MyPlan search result, a read-only slotted view over the decoded JSON object.
+
+    Fields are read from the dict produced by `decode_courses()`, so a search
+    response is decoded in one `json.loads` pass plus one small object per
+    course, and `to_dict()`/`to_json()` hand back that data without copying it
+    into and out of a dataclass.
+    """
+
+    __slots__ = ("_data",)
+
+    id = _field("id")
+    courseId = _field("courseId")
+    code = _field("code")
+    subject = _field("subject")
+    level = _field("level")
+    title = _field("title")
+    credit = _field("credit")
+    campus = _field("campus")
+    termId = _field("termId")
+    institution = _field("institution")
+    allCredits = _field("allCredits")
+    genEduReqs = _field("genEduReqs")
+    sectionGroups = _field("sectionGroups")
+    startTime = _field("startTime")
+    endTime = _field("endTime")
+    score = _field("score")
+    latestVersion = _field("latestVersion")
+    expiringTermId = _field("expiringTermId")
+    beginningTermId = _field("beginningTermId")
+    prereqs = _field("prereqs")
+    onlineLearningCodes = _field("onlineLearningCodes")
+    meetingDays = _field("meetingDays")
+    versions = _field("versions")
+    gradingSystems = _field("gradingSystems")
+    open = _field("open")
+    tba = _field("tba")
+    pce = _field("pce")
+    enrRestricted = _field("enrRestricted")
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def to_dict(self) -> dict:
+        """The decoded JSON object itself, not a copy"""
+        return self._data
+
+    def to_json(self) -> str:
+        return json.dumps(self._data)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Course):
+            return NotImplemented
+        return self._data == other._data
+
+    def __repr__(self) -> str:
+        return f"Course({self._data!r})"
+
+
+def decode_courses(content: bytes) -> list[Course]:
+    """Decode a raw search response body into Course records"""
+    return [Course(course) for course in json.loads(content)]
 
 
 @dataclass
@@ -58,9 +100,39 @@ class Instructor:
 
 
 class MyPlanApiClient:
-    """Client for interacting with UW MyPlan course API"""
+    """
+    Client for interacting with UW MyPlan course API
 
-    def __init__(self):
+    Requests share one httpx.AsyncClient with keep-alive connection pooling,
+    created on first use. Use `async with MyPlanApiClient() as client:` or call
+    `aclose()` to release its connections. `http2=True` requires the `h2`
+    package. `transport` replaces the network transport, by default it is
+    picked by HTTP_TRANSPORT_MODE (see `scripts.http_transport`) so syncs can
+    record and replay MyPlan traffic. Set `raise_congestion_errors` when a
+    caller retries throttling and server errors itself (e.g. through
+    `DataSyncOrchestrator`), otherwise they are printed like other errors.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 20,
+        http2: bool = False,
+        timeout: float = 5.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        raise_congestion_errors: bool = False,
+    ):
+        self.rate_limiter = rate_limiter
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self.transport = transport
+        self.raise_congestion_errors = raise_congestion_errors
+        self._client: httpx.AsyncClient | None = None
         self.base_url = "https://course-app-api.planning.sis.uw.edu/api"
         self.headers = {
             "accept": "*/*",
@@ -72,6 +144,30 @@ class MyPlanApiClient:
             "x-csrf-token": os.getenv("MYPLAN_CSRF_TOKEN"),
         }
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                transport=self.transport
+                or get_transport(limits=self.limits, http2=self.http2),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
     def _generate_checksum(self, data: str) -> str:
         """Generate API checksum header value"""
         return hashlib.md5(data.encode()).hexdigest()
@@ -82,8 +178,37 @@ class MyPlanApiClient:
         timestamp = str(int(time.time()))
         return hashlib.sha512(timestamp.encode()).hexdigest()
 
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response | None:
+        """
+        Rate-limited request to the MyPlan API. HTTP errors are printed and
+        return None, except throttling and server errors when
+        `raise_congestion_errors` is set, so retries and adaptive concurrency
+        can back off. A 304 is returned as is.
+        """
+        try:
+            await throttle(self.rate_limiter, self.base_url)
+            response = await self.client.request(
+                method, f"{self.base_url}{path}", **kwargs
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as e:
+            if self.raise_congestion_errors and is_congestion_error(e):
+                raise
+            print(f"Error making request to MyPlan API: {str(e)}")
+            return None
+
     async def search_courses(self, query: str) -> list[Course]:
         """Search for courses using the MyPlan API"""
+        return decode_courses(await self.search_courses_raw(query))
+
+    async def search_courses_raw(self, query: str) -> bytes:
+        """Search for courses, returning the JSON response body untouched
+
+        Use this when the results are stored or forwarded as-is, and
+        `decode_courses()` when fields are needed.
+        """
 
         payload = {
             "username": "GUEST",
@@ -99,47 +224,24 @@ class MyPlanApiClient:
             "days": [],
         }
 
-        headers = {
-            **self.headers,
-        }
-
-        try:
-            response = httpx.post(
-                f"{self.base_url}/courses", headers=headers, json=payload
-            )
-            response.raise_for_status()
-            return [Course(**course) for course in response.json()]
-        except httpx.HTTPStatusError as e:
-            print(f"Error making request to MyPlan API: {str(e)}")
-            return {}
+        response = await self._request("POST", "/courses", json=payload)
+        if response is None:
+            return b"[]"
+        return response.content
 
     async def get_subject_areas(self) -> list[SubjectArea]:
         """Get subject areas from the MyPlan API"""
-        headers = {
-            **self.headers,
-        }
-
-        try:
-            response = httpx.get(f"{self.base_url}/subjectAreas", headers=headers)
-            response.raise_for_status()
-            return [SubjectArea(**subject_area) for subject_area in response.json()]
-        except httpx.HTTPStatusError as e:
-            print(f"Error making request to MyPlan API: {str(e)}")
+        response = await self._request("GET", "/subjectAreas")
+        if response is None:
             return {}
+        return [SubjectArea(**subject_area) for subject_area in response.json()]
 
     async def get_instructors(self) -> list[Instructor]:
         """Get instructors from the MyPlan API"""
-        headers = {
-            **self.headers,
-        }
-
-        try:
-            response = httpx.get(f"{self.base_url}/instructors", headers=headers)
-            response.raise_for_status()
-            return [Instructor(**instructor) for instructor in response.json()]
-        except httpx.HTTPStatusError as e:
-            print(f"Error making request to MyPlan API: {str(e)}")
+        response = await self._request("GET", "/instructors")
+        if response is None:
             return {}
+        return [Instructor(**instructor) for instructor in response.json()]
 
     async def get_course_detail(
         self, course_code: str, course_id: str | None = None
@@ -153,14 +255,45 @@ class MyPlanApiClient:
         Returns:
             dict: Course details response
         """
-        try:
-            response = httpx.get(
-                f"{self.base_url}/courses/{course_code}/details",
-                params={"courseId": course_id} if course_id else {},
-                headers=self.headers,
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            print(f"Error making request to MyPlan API: {str(e)}")
-            return {}
+        detail, _ = await self.get_course_detail_conditional(course_code, course_id)
+        return detail
+
+    async def get_course_detail_conditional(
+        self,
+        course_code: str,
+        course_id: str | None = None,
+        validators: dict | None = None,
+    ) -> tuple[dict | None, dict]:
+        """Get course details, sending If-None-Match/If-Modified-Since
+
+        Args:
+            course_code (str): Course code (e.g. "INFO 200")
+            course_id (str): Course ID (e.g. "1e8e2a4c-7db3-4283-8cba-31ecb2c928c2")
+            validators (dict): "etag" and "last_modified" from a previous response
+
+        Returns:
+            tuple: Course details response (None if not modified) and the
+                response's validators
+        """
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        response = await self._request(
+            "GET",
+            f"/courses/{course_code}/details",
+            params={"courseId": course_id} if course_id else {},
+            headers=headers,
+        )
+        if response is None:
+            return {}, {}
+        new_validators = {
+            name: response.headers[header]
+            for name, header in (("etag", "etag"), ("last_modified", "last-modified"))
+            if header in response.headers
+        }
+        if response.status_code == 304:
+            return None, new_validators
+        return response.json(), new_validators
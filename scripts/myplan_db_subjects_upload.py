@@ -31,9 +31,9 @@ def insert_subject_areas(conn, cursor, subject_areas: list[SubjectArea]):
 
 
 async def main():
-    client = MyPlanApiClient()
     print("Getting subject areas...")
-    subject_areas = await client.get_subject_areas()
+    async with MyPlanApiClient() as client:
+        subject_areas = await client.get_subject_areas()
 
     # unique check
     subject_areas_set = set(subject_area.code for subject_area in subject_areas)
@@ -5,8 +5,6 @@ from scripts.db_queries import (
 )
 from scripts.db import with_db
 from rich import print
-from dataclasses import asdict
-import json
 
 
 @with_db
@@ -109,53 +107,54 @@ async def main():
         f"Subject areas with courseDuplicate: {has_duplicate_subject_areas_count} / {total_subject_areas}"
     )
 
-    client = MyPlanApiClient()
-
     count = 0
     problematic_subject_areas = []
-    for subject_area in subject_areas:
-        print(
-            f"\n\n--------\nSearching for courses in {subject_area['quotedCode']}...\n--------\n"
-        )
-        courses = await client.search_courses(f"{subject_area['quotedCode']}")
-
-        print(
-            f"Found {len(courses)} courses for subject area {subject_area['quotedCode']}"
-        )
-
-        # unique check
-        courses_set = set(f"{course.code}-{course.termId}" for course in courses)
-        # courses_set = set(f"{course.courseId}-{course.termId}" for course in courses)
-        if len(courses_set) != len(courses):
+    async with MyPlanApiClient() as client:
+        for subject_area in subject_areas:
+            print(
+                f"\n\n--------\nSearching for courses in {subject_area['quotedCode']}...\n--------\n"
+            )
+            courses = await client.search_courses(f"{subject_area['quotedCode']}")
+
+            print(
+                f"Found {len(courses)} courses for subject area {subject_area['quotedCode']}"
+            )
+
+            # unique check
+            courses_set = set(f"{course.code}-{course.termId}" for course in courses)
+            # courses_set = set(f"{course.courseId}-{course.termId}" for course in courses)
+            if len(courses_set) != len(courses):
+                print(
+                    f"⚠️ Duplicate courses found for subject area {subject_area['code']} {len(courses_set)} / {len(courses)}"
+                )
+                set_myplan_subject_course_duplicate(subject_area["code"])
+                problematic_subject_areas.append(subject_area)
+
+                # remove duplicate by selecting the first one
+                # new_courses = []
+                # seen_courses = set()
+                # for course in courses:
+                #     if f"{course.code}-{course.termId}" not in seen_courses:
+                #         seen_courses.add(f"{course.code}-{course.termId}")
+                #         new_courses.append(course)
+                # print(f"Removing {len(courses) - len(new_courses)} duplicate courses")
+                # courses = new_courses
+
+            insert_myplan_courses(
+                [
+                    {
+                        "code": course.code,
+                        "quarter": course.termId if course.termId else "null",
+                        "data": course.to_json(),
+                        "subjectAreaCode": subject_area["code"],
+                    }
+                    for course in courses
+                ]
+            )
             print(
-                f"⚠️ Duplicate courses found for subject area {subject_area['code']} {len(courses_set)} / {len(courses)}"
+                f"Inserted {len(courses)} courses for {subject_area['quotedCode']}\n\n"
             )
-            set_myplan_subject_course_duplicate(subject_area["code"])
-            problematic_subject_areas.append(subject_area)
-
-            # remove duplicate by selecting the first one
-            # new_courses = []
-            # seen_courses = set()
-            # for course in courses:
-            #     if f"{course.code}-{course.termId}" not in seen_courses:
-            #         seen_courses.add(f"{course.code}-{course.termId}")
-            #         new_courses.append(course)
-            # print(f"Removing {len(courses) - len(new_courses)} duplicate courses")
-            # courses = new_courses
-
-        insert_myplan_courses(
-            [
-                {
-                    "code": course.code,
-                    "quarter": course.termId if course.termId else "null",
-                    "data": json.dumps(asdict(course)),
-                    "subjectAreaCode": subject_area["code"],
-                }
-                for course in courses
-            ]
-        )
-        print(f"Inserted {len(courses)} courses for {subject_area['quotedCode']}\n\n")
-        count += len(courses)
+            count += len(courses)
 
     print("Done")
     print(f"Inserted {count} courses")
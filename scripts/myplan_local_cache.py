@@ -1,7 +1,8 @@
 from scripts.cache import DistributedCacheController
 
-
 myplan_search_result_cache_controller = DistributedCacheController(
-    "temp/sync_myplan_courses/myplan_search_result"
+    "temp/sync_myplan_courses/myplan_search_result",
+    # Keep decoded search results around for repeated passes over the keys
+    lru_max_bytes=256 * 1024 * 1024,
 )
 myplan_search_result_cache_controller.load()
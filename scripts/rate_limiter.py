@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Requests per second and burst size for the upstream hosts we scrape.
+# Keys are either a host or a host followed by a path prefix.
+DEFAULT_HOST_LIMITS: dict[str, tuple[float, int]] = {
+    "course-app-api.planning.sis.uw.edu": (5.0, 5),
+    "dawgpath.uw.edu": (5.0, 5),
+    "www.washington.edu/cec": (10.0, 10),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts of up to
+    `burst` acquisitions.
+
+    Callers reserve a token up front and sleep off any debt outside the lock,
+    so the bucket can be shared between coroutines, event loops and threads.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Take `tokens` from the bucket and return how long to wait for them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: int = 1):
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Per-host token buckets shared by the orchestrator, the MyPlan client and
+    the CEC/DawgPath scrapers.
+
+    Hosts without a configured limit are not throttled unless `default_rate`
+    is set, in which case they each get their own bucket.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, tuple[float, int]]] = None,
+        default_rate: Optional[float] = None,
+        default_burst: int = 1,
+    ):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        for key, (rate, burst) in (limits or {}).items():
+            self.set_limit(key, rate, burst)
+
+    def set_limit(self, key: str, rate: float, burst: int = 1):
+        self.buckets[key.rstrip("/")] = TokenBucket(rate, burst)
+
+    @staticmethod
+    def _normalize(url_or_host: str) -> str:
+        if "://" not in url_or_host:
+            return url_or_host.rstrip("/")
+        parts = urlsplit(url_or_host)
+        return f"{parts.netloc}{parts.path}".rstrip("/")
+
+    def bucket_for(self, url_or_host: str) -> Optional[TokenBucket]:
+        """Find the bucket with the longest key matching a URL or host"""
+        target = self._normalize(url_or_host)
+        best_key = None
+        for key in self.buckets:
+            if target == key or target.startswith(key + "/"):
+                if best_key is None or len(key) > len(best_key):
+                    best_key = key
+        if best_key is not None:
+            return self.buckets[best_key]
+
+        if self.default_rate is None:
+            return None
+        host = target.split("/", 1)[0]
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.default_rate, self.default_burst)
+            return self.buckets[host]
+
+    async def acquire(self, url_or_host: str, tokens: int = 1):
+        bucket = self.bucket_for(url_or_host)
+        if bucket is not None:
+            await bucket.acquire(tokens)
+
+    def scaled(self, fraction: float) -> "RateLimiter":
+        """
+        A new limiter with every rate scaled by `fraction`, e.g. one shard's
+        slice of the budget when the work is split across processes
+        """
+        limiter = RateLimiter(
+            default_rate=(
+                self.default_rate * fraction if self.default_rate is not None else None
+            ),
+            default_burst=max(1, int(self.default_burst * fraction)),
+        )
+        for key, bucket in self.buckets.items():
+            limiter.set_limit(
+                key, bucket.rate * fraction, max(1, int(bucket.burst * fraction))
+            )
+        return limiter
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+async def throttle(rate_limiter: Optional[RateLimiter], url: str):
+    """Wait for `url`'s bucket if a rate limiter is given, otherwise do nothing"""
+    if rate_limiter is not None:
+        await rate_limiter.acquire(url)
+
+
+async def check(
+    limits: Optional[dict[str, tuple[float, int]]] = None, extra_requests: int = 10
+):
+    """
+    Send `burst + extra_requests` concurrent requests per host bucket to an
+    in-process fake server that records when each request arrives, and assert
+    that a full bucket lets `burst` requests through at once and then one per
+    `1 / rate` seconds. MyPlan traffic goes through MyPlanApiClient, the other
+    hosts through an httpx client throttled like the CEC/DawgPath scrapers.
+    """
+    # Imported here, scripts.myplan_api itself imports this module
+    from scripts.myplan_api import MyPlanApiClient
+
+    limits = limits or DEFAULT_HOST_LIMITS
+    rate_limiter = RateLimiter(limits)
+    bucket_keys = {bucket: key for key, bucket in rate_limiter.buckets.items()}
+    arrivals: dict[str, list[float]] = {key: [] for key in rate_limiter.buckets}
+
+    def fake_server(request: httpx.Request) -> httpx.Response:
+        bucket = rate_limiter.bucket_for(str(request.url))
+        arrivals[bucket_keys[bucket]].append(time.monotonic())
+        return httpx.Response(200, json=[])
+
+    transport = httpx.MockTransport(fake_server)
+    myplan = MyPlanApiClient(rate_limiter=rate_limiter, transport=transport)
+    # The fake server needs no MyPlan credentials
+    myplan.headers = {k: v for k, v in myplan.headers.items() if v is not None}
+
+    async def scraper_get(client: httpx.AsyncClient, url: str):
+        await throttle(rate_limiter, url)
+        await client.get(url)
+
+    async with myplan, httpx.AsyncClient(transport=transport) as client:
+        for key, bucket in rate_limiter.buckets.items():
+            rate, burst = bucket.rate, bucket.burst
+            requests = burst + extra_requests
+            if rate_limiter.bucket_for(myplan.base_url) is bucket:
+                await asyncio.gather(
+                    *[myplan.get_instructors() for _ in range(requests)]
+                )
+            else:
+                url = f"https://{key}/check"
+                await asyncio.gather(
+                    *[scraper_get(client, url) for _ in range(requests)]
+                )
+
+            times = sorted(arrivals[key])
+            assert len(times) == requests, f"{key}: {len(times)} of {requests} sent"
+            tolerance = 0.5 / rate
+            offsets = [t - times[0] for t in times]
+            for i, offset in enumerate(offsets):
+                # Requests past the burst wait for one refilled token each
+                expected = max(0, i - burst + 1) / rate
+                assert abs(offset - expected) <= tolerance, (
+                    f"{key}: request {i + 1} arrived at {offset:.3f}s, "
+                    f"expected {expected:.3f}s"
+                )
+            print(
+                f"{key}: burst of {burst}, then {requests - burst} requests at "
+                f"{(requests - burst) / (offsets[-1] or 1):.1f}/s (limit {rate}/s)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(check())
@@ -0,0 +1,97 @@
+import json
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from scripts.adaptive_concurrency import is_congestion_error
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether an error is worth retrying: timeouts, dropped connections and
+    429/5xx responses. Anything else (4xx, parse errors, bugs) is fatal.
+    """
+    # Exactly the errors that also make adaptive concurrency back off
+    return is_congestion_error(error)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class DeadLetterQueue:
+    """
+    Items that failed for good, persisted as a JSON-lines file.
+
+    Failures are appended as they happen so they survive a crash; an entry is
+    cleared by appending a resolved marker, and `compact()` rewrites the file
+    with only the outstanding entries.
+    """
+
+    file: Path
+
+    def __init__(self, file: str | Path):
+        if isinstance(file, str):
+            file = Path(file)
+        self.file = file
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.entries: dict[str, dict] = {}
+
+    def load(self):
+        self.entries = {}
+        if not self.file.exists():
+            return self.entries
+        with open(self.file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash, the item is retried on the next sync
+                    continue
+                if entry.get("resolved"):
+                    self.entries.pop(entry["key"], None)
+                else:
+                    self.entries[entry["key"]] = entry
+        return self.entries
+
+    def _append(self, entry: dict):
+        with open(self.file, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def add(self, key: str, item: Any, error: BaseException, attempts: int):
+        entry = {
+            "key": key,
+            "item": item,
+            "error": f"{type(error).__name__}: {error}",
+            "attempts": attempts,
+            "failed_at": datetime.now().isoformat(),
+        }
+        self.entries[key] = entry
+        self._append(entry)
+
+    def resolve(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self._append({"key": key, "resolved": True})
+
+    def items(self) -> list[Any]:
+        return [entry["item"] for entry in self.entries.values()]
+
+    def compact(self):
+        tmp_file = self.file.with_suffix(self.file.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, default=str) + "\n")
+        os.replace(tmp_file, self.file)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Optional[str]) -> bool:
+        return key in self.entries
@@ -21,11 +21,11 @@ async def main():
     # updater.update_courses()
 
     # test search_courses
-    client = MyPlanApiClient()
-    subject_areas = await client.get_subject_areas()
-    s1 = subject_areas[0]
-    # print(s1)
-    courses = await client.search_courses(f"{s1.code}")
+    async with MyPlanApiClient() as client:
+        subject_areas = await client.get_subject_areas()
+        s1 = subject_areas[0]
+        # print(s1)
+        courses = await client.search_courses(f"{s1.code}")
     print(courses)
     print(f"Total courses for '{s1.code}': {len(courses)}")
 
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Bounded write stage between fetching and cache persistence.
+
+    Values are queued with `put()` and a dedicated writer task flushes them to
+    the cache controller on a worker thread in batches of up to `batch_size`,
+    or whatever has queued up after `flush_interval` seconds. `put()` blocks
+    once `max_pending` writes are queued, so a slow disk applies backpressure
+    instead of growing memory. Queued keys count as cached via `in` until they
+    are written. Controllers with `set_many()` persist a batch in one call.
+    Metadata passed to `put()` is stored with the controller's `touch()` right
+    after the value. `on_written` receives the written keys and the batch
+    write time.
+    """
+
+    def __init__(
+        self,
+        cache_controller: Any,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_pending: int = 200,
+        on_written: Optional[Callable[[list[str], float], None]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        self.cache_controller = cache_controller
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_written = on_written
+        self.on_error = on_error
+
+        self.pending: dict[str, Any] = {}
+        self.pending_meta: dict[str, dict] = {}
+        self.written = 0
+        self.batches = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, key: str, value: Any, meta: Optional[dict] = None):
+        self.pending[key] = value
+        if meta:
+            self.pending_meta[key] = meta
+        else:
+            self.pending_meta.pop(key, None)
+        await self._queue.put(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.pending
+
+    async def close(self):
+        """Flush everything still queued and stop the writer task"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            key = await self._queue.get()
+            if key is _STOP:
+                break
+
+            batch = [key]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    key = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if key is _STOP:
+                    stop = True
+                    break
+                batch.append(key)
+
+            await self._write(batch)
+
+    async def _write(self, keys: list[str]):
+        items = {key: self.pending[key] for key in keys if key in self.pending}
+        if not items:
+            return
+        meta = {
+            key: self.pending_meta[key] for key in items if key in self.pending_meta
+        }
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write_sync, items, meta)
+        except Exception as e:
+            for key in items:
+                if self.on_error:
+                    self.on_error(key, e)
+        else:
+            self.written += len(items)
+            self.batches += 1
+            if self.on_written:
+                self.on_written(list(items), time.perf_counter() - start)
+        finally:
+            # Keep keys that were re-queued with a newer value meanwhile
+            for key, value in items.items():
+                if self.pending.get(key) is value:
+                    del self.pending[key]
+                    self.pending_meta.pop(key, None)
+
+    def _write_sync(self, items: dict[str, Any], meta: dict[str, dict]):
+        if hasattr(self.cache_controller, "set_many"):
+            self.cache_controller.set_many(items)
+        else:
+            for key, value in items.items():
+                self.cache_controller.set(key, value)
+        for key, fields in meta.items():
+            self.cache_controller.touch(key, **fields)